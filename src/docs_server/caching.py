@@ -1,50 +1,216 @@
 """
 Caching operations for ServeMD Documentation Server.
 Handles HTML and llms.txt content caching.
+
+Rendered HTML is cached on disk under CACHE_ROOT and, for the most recently
+used pages, in an in-process LRU in front of it. Entries are not revalidated
+on read; the docs watcher invalidates them when source files change.
+
+Cached files are compressed once at write time (gzip, plus brotli when the
+optional brotli package is installed) and stored next to the original as
+.gz/.br siblings, so responses never compress on the fly.
 """
 
+import gzip
+import hashlib
 import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate
 from pathlib import Path
 
 from .config import settings
 
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
 logger = logging.getLogger(__name__)
 
+# llms cache files derived from the docs tree
+LLMS_CACHE_FILES = ("llms.txt", "llms-full.txt")
 
-async def get_cached_html(file_path: Path) -> str | None:
+# Content-Encoding -> file suffix of the precompressed sibling, in order of preference
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def compress_variants(content: bytes) -> dict[str, bytes]:
+    """Compress content with every supported Content-Encoding."""
+    variants = {"gzip": gzip.compress(content, compresslevel=6, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(content, quality=5)
+    return variants
+
+
+def _write_with_variants(cache_path: Path, content: bytes, variants: dict[str, bytes] | None = None) -> None:
+    """Write a cache file and its precompressed siblings."""
+    if variants is None:
+        variants = compress_variants(content)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_bytes(content)
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+        variant_path = cache_path.with_name(cache_path.name + suffix)
+        if encoding in variants:
+            variant_path.write_bytes(variants[encoding])
+        else:
+            variant_path.unlink(missing_ok=True)
+
+
+def _unlink_with_variants(cache_path: Path) -> None:
+    """Remove a cache file and its precompressed siblings."""
+    cache_path.unlink(missing_ok=True)
+    for suffix in PRECOMPRESSED_SUFFIXES.values():
+        cache_path.with_name(cache_path.name + suffix).unlink(missing_ok=True)
+
+
+@dataclass(frozen=True)
+class CachedHtml:
+    """A rendered page with the validators used for conditional GET."""
+
+    content: bytes
+    etag: str
+    last_modified: str
+    # Precompressed bodies keyed by Content-Encoding ("gzip", "br")
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, content: bytes, mtime: float, encoded: dict[str, bytes] | None = None) -> "CachedHtml":
+        """Create an entry with a content-hash ETag."""
+        etag = f'"{hashlib.sha1(content, usedforsecurity=False).hexdigest()}"'
+        return cls(
+            content=content,
+            etag=etag,
+            last_modified=formatdate(mtime, usegmt=True),
+            encoded=encoded if encoded is not None else compress_variants(content),
+        )
+
+    def etag_for(self, encoding: str | None) -> str:
+        """ETag of the representation sent with the given Content-Encoding."""
+        if not encoding:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+# In-process LRU of rendered pages, keyed by absolute source path
+_hot_html: OrderedDict[str, CachedHtml] = OrderedDict()
+
+
+def _html_cache_path(file_path: Path) -> Path:
+    """Map a source file under DOCS_ROOT to its HTML cache file."""
+    relative_path = file_path.relative_to(settings.DOCS_ROOT)
+    return settings.CACHE_ROOT / relative_path.with_suffix(".html")
+
+
+def _remember_html(key: str, entry: CachedHtml) -> None:
+    """Insert an entry in the in-process LRU, evicting the least recently used."""
+    if settings.HTML_MEMORY_CACHE_SIZE <= 0:
+        return
+    _hot_html[key] = entry
+    _hot_html.move_to_end(key)
+    while len(_hot_html) > settings.HTML_MEMORY_CACHE_SIZE:
+        _hot_html.popitem(last=False)
+
+
+def get_cached_html_path(file_path: Path) -> Path | None:
     """
-    Get cached HTML content if it exists.
+    Get the path of the cached HTML file if it exists.
     """
     try:
-        # Create cache path
-        relative_path = file_path.relative_to(settings.DOCS_ROOT)
-        cache_path = settings.CACHE_ROOT / relative_path.with_suffix(".html")
+        cache_path = _html_cache_path(file_path)
 
-        if cache_path.exists():
-            return cache_path.read_text(encoding="utf-8")
-    except (OSError, UnicodeDecodeError, ValueError) as e:
-        logger.debug(f"Cache read error: {e}")
+        if cache_path.is_file():
+            return cache_path
+    except (OSError, ValueError) as e:
+        logger.debug(f"Cache lookup error: {e}")
 
     return None
 
 
-async def save_cached_html(file_path: Path, html_content: str) -> None:
+async def get_cached_html_entry(file_path: Path) -> CachedHtml | None:
+    """
+    Get a cached page from the in-process LRU, falling back to the disk cache.
+    Disk hits are promoted into the LRU.
+    """
+    key = os.path.abspath(file_path)
+    entry = _hot_html.get(key)
+    if entry is not None:
+        _hot_html.move_to_end(key)
+        return entry
+
+    cache_path = get_cached_html_path(file_path)
+    if not cache_path:
+        return None
+    try:
+        encoded = {}
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            variant_path = cache_path.with_name(cache_path.name + suffix)
+            if variant_path.is_file():
+                encoded[encoding] = variant_path.read_bytes()
+        entry = CachedHtml.build(cache_path.read_bytes(), cache_path.stat().st_mtime, encoded)
+    except OSError as e:
+        logger.debug(f"Cache read error: {e}")
+        return None
+
+    _remember_html(key, entry)
+    return entry
+
+
+async def get_cached_html(file_path: Path) -> str | None:
     """
-    Save HTML content to cache.
+    Get cached HTML content if it exists.
     """
     try:
-        # Create cache path
-        relative_path = file_path.relative_to(settings.DOCS_ROOT)
-        cache_path = settings.CACHE_ROOT / relative_path.with_suffix(".html")
+        entry = await get_cached_html_entry(file_path)
+        if entry:
+            return entry.content.decode("utf-8")
+    except (UnicodeDecodeError, ValueError) as e:
+        logger.debug(f"Cache read error: {e}")
+
+    return None
+
 
-        # Ensure cache directory exists
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
+async def save_cached_html(file_path: Path, html_content: str) -> CachedHtml:
+    """
+    Save HTML content to cache (write-through: in-process LRU and disk).
+    Returns the cache entry so the caller can serve it with the same validators.
+    """
+    entry = CachedHtml.build(html_content.encode("utf-8"), time.time())
+    _remember_html(os.path.abspath(file_path), entry)
 
-        cache_path.write_text(html_content, encoding="utf-8")
+    try:
+        cache_path = _html_cache_path(file_path)
+        _write_with_variants(cache_path, entry.content, entry.encoded)
         logger.debug(f"Cached HTML: {cache_path}")
     except (OSError, ValueError) as e:
         logger.debug(f"Cache write error: {e}")
 
+    return entry
+
+
+def invalidate_cached_html(file_path: Path) -> None:
+    """Drop the cached page for a source file from memory and disk."""
+    _hot_html.pop(os.path.abspath(file_path), None)
+    try:
+        _unlink_with_variants(_html_cache_path(file_path))
+    except (OSError, ValueError) as e:
+        logger.debug(f"Cache invalidation error: {e}")
+
+
+def clear_cached_html() -> None:
+    """
+    Drop every cached page from memory and disk.
+    Used when navigation files change, since every page embeds the sidebar and topbar.
+    """
+    _hot_html.clear()
+    try:
+        for cache_path in settings.CACHE_ROOT.rglob("*.html"):
+            _unlink_with_variants(cache_path)
+    except OSError as e:
+        logger.debug(f"Cache clear error: {e}")
+
 
 async def get_cached_llms(cache_file: str) -> str | None:
     """
@@ -69,11 +235,25 @@ async def save_cached_llms(cache_file: str, content: str) -> None:
     """
     try:
         cache_path = settings.CACHE_ROOT / cache_file
-
-        # Ensure cache directory exists
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
-
-        cache_path.write_text(content, encoding="utf-8")
+        _write_with_variants(cache_path, content.encode("utf-8"))
         logger.debug(f"Cached llms file: {cache_path}")
     except (OSError, ValueError) as e:
         logger.debug(f"Cache write error for {cache_file}: {e}")
+
+
+def get_cached_llms_variant(cache_file: str, encoding: str) -> Path | None:
+    """Get the path of a precompressed llms cache file ("gzip" or "br") if it exists."""
+    suffix = PRECOMPRESSED_SUFFIXES.get(encoding)
+    if suffix is None:
+        return None
+    variant_path = settings.CACHE_ROOT / f"{cache_file}{suffix}"
+    return variant_path if variant_path.is_file() else None
+
+
+def invalidate_cached_llms() -> None:
+    """Drop the cached llms.txt and llms-full.txt files."""
+    for cache_file in LLMS_CACHE_FILES:
+        try:
+            _unlink_with_variants(settings.CACHE_ROOT / cache_file)
+        except OSError as e:
+            logger.debug(f"Cache invalidation error for {cache_file}: {e}")
@@ -3,15 +3,46 @@ Configuration module for ServeMD Documentation Server.
 Centralizes all environment variables and settings.
 """
 
+import functools
+import glob
 import hashlib
+import html
 import json
 import logging
 import os
 import shutil
+import time
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Supported values for the MD_BACKEND setting
+MARKDOWN_BACKENDS = ("markdown", "cmarkgfm", "mistune")
+
+# Marker in the name of retired cache directories awaiting background deletion
+STALE_CACHE_MARKER = ".stale-"
+
+# Set by main() for the server processes it starts: the cache has already been
+# validated and stale caches are cleaned up by the launching process
+CACHE_PREPARED_ENV = "SERVEMD_CACHE_PREPARED"
+
+
+def _format_mermaid(source: str, language: str, class_name: str, options: dict, md, **kwargs) -> str:
+    """pymdownx.superfences formatter for ```mermaid fences: a div for mermaid.js to render."""
+    return f'<div class="mermaid">{html.escape(source, quote=False)}</div>'
+
+
+def _is_retired_name(name: str, prefix: str = "") -> bool:
+    """Whether name is a retired cache directory name: prefix + ".stale-" + a timestamp."""
+    suffix = name.removeprefix(prefix) if name.startswith(prefix) else ""
+    return suffix.startswith(STALE_CACHE_MARKER) and suffix[len(STALE_CACHE_MARKER) :].isdigit()
+
+
+@functools.lru_cache(maxsize=16)
+def resolved_path_str(path: Path) -> str:
+    """Resolve a path to an absolute string, once per distinct path."""
+    return str(path.resolve())
+
 
 class Settings:
     """Application settings loaded from environment variables."""
@@ -27,6 +58,14 @@ class Settings:
         self.BASE_URL = os.getenv("BASE_URL", None)  # Base URL for absolute links in llms.txt
         self.DEBUG = os.getenv("DEBUG", "false").lower() == "true"
         self.PORT = int(os.getenv("PORT", "8080"))
+        # uvicorn worker processes (ignored in DEBUG mode, which runs a single reloading worker).
+        # Opt-in: rate limits and the in-memory page cache are kept per process
+        self.WORKERS = max(1, int(os.getenv("WORKERS", "1")))
+
+        # Number of rendered pages kept in memory in front of the disk cache (0 disables)
+        self.HTML_MEMORY_CACHE_SIZE = int(os.getenv("HTML_MEMORY_CACHE_SIZE", "128"))
+        # Watch DOCS_ROOT and invalidate cached pages when files change
+        self.WATCH_DOCS = os.getenv("WATCH_DOCS", "true").lower() == "true"
 
         # Reverse proxy trusted IPs for X-Forwarded-For header rewriting.
         # Set to "*" when running behind a Docker Compose proxy (Caddy, Traefik, nginx).
@@ -51,6 +90,11 @@ class Settings:
         else:
             self.CUSTOM_CSS = "custom.css"
 
+        # Markdown backend: "markdown" (Python-Markdown, full extension set) or one of the
+        # faster C/pure-Python parsers "cmarkgfm" / "mistune" (optional dependencies).
+        md_backend = os.getenv("MD_BACKEND", "markdown").strip().lower()
+        self.MD_BACKEND = md_backend if md_backend in MARKDOWN_BACKENDS else "markdown"
+
         # Markdown extensions configuration
         self.markdown_extensions = [
             "codehilite",
@@ -82,7 +126,7 @@ class Settings:
                     {
                         "name": "mermaid",
                         "class": "mermaid",
-                        "format": lambda source: f'<div class="mermaid">{source}</div>',
+                        "format": _format_mermaid,
                     }
                 ]
             },
@@ -91,9 +135,22 @@ class Settings:
             },
         }
 
+        # Retired cache directories, deleted in the background once the app starts
+        self.stale_cache_paths: list[Path] = []
+
         # Initialize directories
         self._init_directories()
 
+    @property
+    def DOCS_ROOT_ABS(self) -> str:
+        """DOCS_ROOT resolved to an absolute path string, computed once per DOCS_ROOT value."""
+        return resolved_path_str(self.DOCS_ROOT)
+
+    @property
+    def CACHE_ROOT_ABS(self) -> str:
+        """CACHE_ROOT resolved to an absolute path string, computed once per CACHE_ROOT value."""
+        return resolved_path_str(self.CACHE_ROOT)
+
     def _calculate_docs_hash(self) -> str:
         """
         Calculate SHA256 hash of all documentation files.
@@ -151,6 +208,64 @@ class Settings:
         except Exception as e:
             logger.warning(f"Could not save cache metadata: {e}")
 
+    def _find_stale_caches(self) -> list[Path]:
+        """
+        Find retired cache directories left behind by earlier runs.
+        Only the exact names _retire_cache() creates match: "<cache>.stale-<ns>"
+        next to CACHE_ROOT and ".stale-<ns>" inside it.
+        """
+        name = self.CACHE_ROOT.name
+        siblings = [
+            path
+            for path in self.CACHE_ROOT.parent.glob(f"{glob.escape(name)}{STALE_CACHE_MARKER}*")
+            if _is_retired_name(path.name, name)
+        ]
+        nested = []
+        if self.CACHE_ROOT.is_dir():
+            nested = [path for path in self.CACHE_ROOT.glob(f"{STALE_CACHE_MARKER}*") if _is_retired_name(path.name)]
+        return [path for path in [*siblings, *nested] if path.is_dir()]
+
+    def _retire_cache(self, keep: tuple[str, ...] = ()) -> None:
+        """
+        Move the current cache out of the way instead of deleting it.
+
+        Renaming is O(1) on the same filesystem, so startup does not wait for
+        large caches to be removed; purge_stale_caches() deletes them later.
+        Entries named in keep are carried over into the fresh cache directory.
+        """
+        if not self.CACHE_ROOT.is_dir() or not any(self.CACHE_ROOT.iterdir()):
+            return
+
+        stale_suffix = f"{STALE_CACHE_MARKER}{time.time_ns()}"
+        try:
+            stale_path = self.CACHE_ROOT.rename(self.CACHE_ROOT.with_name(self.CACHE_ROOT.name + stale_suffix))
+        except OSError:
+            # CACHE_ROOT is a mount point or its parent is not writable:
+            # retire its entries into a directory inside it instead
+            stale_path = self.CACHE_ROOT / stale_suffix
+            stale_path.mkdir()
+            for entry in self.CACHE_ROOT.iterdir():
+                if entry != stale_path and not _is_retired_name(entry.name) and entry.name not in keep:
+                    entry.rename(stale_path / entry.name)
+        else:
+            self.CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+            for name in keep:
+                if (stale_path / name).exists():
+                    (stale_path / name).rename(self.CACHE_ROOT / name)
+
+        self.stale_cache_paths.append(stale_path)
+
+    def purge_stale_caches(self) -> None:
+        """
+        Delete retired cache directories.
+        Blocking; main() and the app lifespan run it in a background thread.
+        """
+        # Take the whole list at once so concurrent callers never delete the same path
+        stale_paths, self.stale_cache_paths = self.stale_cache_paths, []
+        for stale_path in stale_paths:
+            shutil.rmtree(stale_path, ignore_errors=True)
+            logger.debug(f"Removed stale cache: {stale_path}")
+
     def _init_directories(self):
         """
         Initialize directories and invalidate cache only when docs change.
@@ -161,6 +276,8 @@ class Settings:
         - If match: keep all caches (fast startup)
         - If mismatch: clear html/llms caches (docs changed)
         - DEBUG mode: always clear caches for fresh data
+
+        Cleared caches are renamed aside and deleted in the background.
         """
         try:
             # Ensure DOCS_ROOT exists
@@ -169,6 +286,13 @@ class Settings:
             # Ensure cache directory exists
             self.CACHE_ROOT.mkdir(parents=True, exist_ok=True)
 
+            if os.getenv(CACHE_PREPARED_ENV) and not self.DEBUG:
+                # Worker started by main(): the launching process already validated the cache
+                return
+
+            # Pick up caches retired by earlier runs that exited before deleting them
+            self.stale_cache_paths.extend(self._find_stale_caches())
+
             # Calculate current docs hash
             current_hash = self._calculate_docs_hash()
             cached_hash = self._load_cache_hash()
@@ -193,20 +317,16 @@ class Settings:
                 logger.debug("Documentation unchanged: keeping cache")
 
             if should_invalidate:
-                # Clean html and llms cache subdirectories
+                # Retire html and llms caches
                 # MCP index has its own hash-based validation in the indexer
-                cache_subdirs_to_clean = ["html", "llms"]
-                for subdir in cache_subdirs_to_clean:
-                    cache_subdir = self.CACHE_ROOT / subdir
-                    if cache_subdir.exists():
-                        shutil.rmtree(cache_subdir)
-                        logger.debug(f"Cleaned cache: {subdir}/")
+                self._retire_cache(keep=("mcp",))
+                logger.debug("Retired html/llms cache")
 
                 # Save new hash
                 self._save_cache_hash(current_hash)
 
-            logger.info(f"📁 DOCS_ROOT: {self.DOCS_ROOT.absolute()}")
-            logger.info(f"💾 CACHE_ROOT: {self.CACHE_ROOT.absolute()}")
+            logger.info(f"📁 DOCS_ROOT: {self.DOCS_ROOT_ABS}")
+            logger.info(f"💾 CACHE_ROOT: {self.CACHE_ROOT_ABS}")
 
         except (OSError, PermissionError) as e:
             logger.warning(f"Could not create directories: {e}")
@@ -215,11 +335,12 @@ class Settings:
     def clear_cache(self) -> None:
         """
         Remove all contents of the cache directory.
-        Used when --clear-cache is passed at startup.
+        Used when --clear-cache is passed at startup; the old contents are
+        deleted in the background once the app starts.
         """
         try:
             if self.CACHE_ROOT.exists():
-                shutil.rmtree(self.CACHE_ROOT)
+                self._retire_cache()
                 logger.info("🗑️ Cache cleared")
             self.CACHE_ROOT.mkdir(parents=True, exist_ok=True)
         except (OSError, PermissionError) as e:
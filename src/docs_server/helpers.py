@@ -3,14 +3,16 @@ Helper utilities and navigation parsing for ServeMD Documentation Server.
 Contains pure utility functions and navigation structure parsers.
 """
 
+import functools
 import logging
 import os
 import re
+from collections.abc import Callable
 from pathlib import Path, PurePosixPath
 from typing import Any
 from urllib.parse import quote, unquote
 
-from .config import settings
+from .config import resolved_path_str, settings
 
 
 def build_chatgpt_url(raw_md_url: str) -> str:
@@ -130,19 +132,19 @@ def highlight_search_terms(html: str, query: str) -> str:
     return "".join(result)
 
 
-def is_safe_path(path: str, base_path: Path) -> bool:
+def _resolve_safe_path(path: str, base_path: Path) -> str | None:
     """
-    Validate that the requested path is within the allowed directory boundaries.
-    Prevents directory traversal attacks.
+    Resolve a requested path under base_path, or return None if it escapes it.
 
     Strategy: split the path into components and apply os.path.basename to each
     one (a CodeQL-recognised sanitiser).  Only the resulting clean tokens are
-    ever passed to pathlib, so no raw user data touches the Path constructor.
+    joined onto the (cached) resolved base, followed by a single realpath and
+    commonpath check, so symlinks pointing outside the base are rejected too.
     """
     try:
         parts = PurePosixPath(path).parts
     except Exception:
-        return False
+        return None
 
     sanitized: list[str] = []
     for part in parts:
@@ -150,20 +152,29 @@ def is_safe_path(path: str, base_path: Path) -> bool:
         # prefix from a component.  We then explicitly reject empty, "." and "..".
         token = os.path.basename(part)
         if token in ("", ".", ".."):
-            return False
+            return None
         sanitized.append(token)
 
     if not sanitized:
-        return False
+        return None
 
     try:
-        abs_base = base_path.resolve()
-        # joinpath receives only sanitized tokens – no user data in path construction.
-        candidate = abs_base.joinpath(*sanitized).resolve()
-        base_str = str(abs_base)
-        return str(candidate).startswith(base_str + os.sep) or str(candidate) == base_str
+        base_str = resolved_path_str(base_path)
+        # join receives only sanitized tokens – no user data in path construction.
+        candidate = os.path.realpath(os.path.join(base_str, *sanitized))
+        if os.path.commonpath([candidate, base_str]) != base_str:
+            return None
+        return candidate
     except (ValueError, OSError):
-        return False
+        return None
+
+
+def is_safe_path(path: str, base_path: Path) -> bool:
+    """
+    Validate that the requested path is within the allowed directory boundaries.
+    Prevents directory traversal attacks.
+    """
+    return _resolve_safe_path(path, base_path) is not None
 
 
 def get_custom_css_path() -> Path | None:
@@ -180,28 +191,56 @@ def get_custom_css_path() -> Path | None:
     return css_path
 
 
-def get_file_path(requested_path: str) -> Path | None:
-    """
-    Get the actual file path for a requested resource.
-    Returns None if the path is unsafe or file doesn't exist.
-    """
-    # Remove leading slash and decode URL encoding
-    clean_path = unquote(requested_path.lstrip("/"))
+# File lookups are only cached while the docs watcher runs, since it is what
+# clears the cache when files are created or deleted.
+_file_path_cache_enabled = False
 
+
+def _lookup_file_path(clean_path: str, docs_root: Path) -> Path | None:
+    """Validate a decoded request path and check that the file exists."""
     # Security check
-    if not is_safe_path(clean_path, settings.DOCS_ROOT):
+    resolved = _resolve_safe_path(clean_path, docs_root)
+    if resolved is None:
         safe_log = clean_path.replace("\r", "").replace("\n", "")
         logger.warning("Unsafe path requested: %s", safe_log)
         return None
 
-    file_path = settings.DOCS_ROOT / clean_path
-
     # Check if file exists
-    if not file_path.exists() or not file_path.is_file():
-        logger.debug(f"File not found: {file_path}")
+    if not os.path.isfile(resolved):
+        logger.debug(f"File not found: {resolved}")
         return None
 
-    return file_path
+    return docs_root / clean_path
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_file_path(clean_path: str, docs_root: Path) -> Path | None:
+    return _lookup_file_path(clean_path, docs_root)
+
+
+def set_file_path_cache_enabled(enabled: bool) -> None:
+    """Enable or disable caching of get_file_path() results. Clears the cache."""
+    global _file_path_cache_enabled
+    _file_path_cache_enabled = enabled
+    clear_file_path_cache()
+
+
+def clear_file_path_cache() -> None:
+    """Forget cached get_file_path() results (positive and negative)."""
+    _cached_file_path.cache_clear()
+
+
+def get_file_path(requested_path: str) -> Path | None:
+    """
+    Get the actual file path for a requested resource.
+    Returns None if the path is unsafe or file doesn't exist.
+    """
+    # Remove leading slash and decode URL encoding
+    clean_path = unquote(requested_path.lstrip("/"))
+
+    if _file_path_cache_enabled:
+        return _cached_file_path(clean_path, settings.DOCS_ROOT)
+    return _lookup_file_path(clean_path, settings.DOCS_ROOT)
 
 
 def extract_table_of_contents(html_content: str) -> list[dict[str, str]]:
@@ -263,6 +302,38 @@ def convert_md_links_to_html(content: str) -> str:
     return re.sub(pattern, replace_link, content)
 
 
+# Parsed navigation files keyed by path, reused while the file's (mtime, size) is unchanged.
+# The docs watcher also clears it when sidebar.md or topbar.md changes.
+_nav_cache: dict[Path, tuple[tuple[int, int], Any]] = {}
+
+
+def _cached_nav_file(parse: Callable[[Path], Any]) -> Callable[[Path], Any]:
+    """Cache a navigation file parser per path. Callers must not modify the result."""
+
+    @functools.wraps(parse)
+    def wrapper(path: Path) -> Any:
+        try:
+            stat = path.stat()
+        except OSError:
+            return parse(path)
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = _nav_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        result = parse(path)
+        _nav_cache[path] = (key, result)
+        return result
+
+    return wrapper
+
+
+def clear_navigation_cache() -> None:
+    """Forget parsed sidebar.md / topbar.md navigation."""
+    _nav_cache.clear()
+
+
 def parse_topbar_links() -> dict[str, list[dict[str, str]]]:
     """
     Parse topbar.md file to create structured top navigation with left/middle/right sections.
@@ -272,6 +343,11 @@ def parse_topbar_links() -> dict[str, list[dict[str, str]]]:
         logger.debug(f"Topbar file not found: {topbar_path}")
         return {"left": [], "middle": [], "right": []}
 
+    return _parse_topbar_file(topbar_path)
+
+
+@_cached_nav_file
+def _parse_topbar_file(topbar_path: Path) -> dict[str, list[dict[str, str]]]:
     try:
         content = topbar_path.read_text(encoding="utf-8")
         sections = {"left": [], "middle": [], "right": []}
@@ -366,6 +442,11 @@ def parse_sidebar_navigation() -> list[dict[str, Any]]:
         logger.warning(f"Sidebar file not found: {sidebar_path}")
         return []
 
+    return _parse_sidebar_file(sidebar_path)
+
+
+@_cached_nav_file
+def _parse_sidebar_file(sidebar_path: Path) -> list[dict[str, Any]]:
     try:
         content = sidebar_path.read_text(encoding="utf-8")
         nav_items = []
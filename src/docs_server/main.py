@@ -4,38 +4,77 @@ A lightweight documentation server for serving markdown files as HTML.
 Inspired by Nuxt UI design system and documentation patterns.
 """
 
+import asyncio
+import functools
 import html
 import logging
+import mimetypes
+import os
 import re
-from contextlib import asynccontextmanager
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any
 from urllib.parse import quote
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.staticfiles import NotModifiedResponse
 
 from . import __version__
-from .caching import get_cached_html, get_cached_llms, save_cached_html, save_cached_llms
-from .config import settings
+from .caching import (
+    PRECOMPRESSED_SUFFIXES,
+    CachedHtml,
+    get_cached_html_entry,
+    get_cached_llms,
+    get_cached_llms_variant,
+    save_cached_html,
+    save_cached_llms,
+)
+from .config import CACHE_PREPARED_ENV, settings
 from .helpers import (
     build_chatgpt_url,
     build_claude_url,
     build_mistral_url,
-    extract_table_of_contents,
     format_search_results_human,
     get_custom_css_path,
     get_file_path,
+    is_safe_path,
     parse_sidebar_navigation,
     parse_topbar_links,
     path_to_doc_url,
 )
 from .llms_service import generate_llms_txt_content
-from .markdown_service import render_markdown_to_html
+from .markdown_service import render_markdown
 from .templates import create_html_template, render_servemd_about_content
+from .watcher import watch_docs
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -45,19 +84,149 @@ logger = logging.getLogger(__name__)
 limiter = Limiter(key_func=get_remote_address)
 
 
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialized with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class VaryMergingGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that does not repeat a Vary token the app already set.
+
+    Precompressed responses set "Vary: Accept-Encoding" themselves; GZipMiddleware
+    appends it again to uncompressed bodies above minimum_size.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        async def send_with_merged_vary(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                vary = headers.get("vary")
+                if vary:
+                    tokens = {token.strip().lower(): token.strip() for token in vary.split(",")}
+                    headers["vary"] = ", ".join(tokens.values())
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_merged_vary)
+
+
+# Media types for files served from DOCS_ROOT; other suffixes fall back to mimetypes
+MEDIA_TYPES = MappingProxyType(
+    {
+        ".html": "text/html; charset=utf-8",
+        ".htm": "text/html; charset=utf-8",
+        ".css": "text/css",
+        ".js": "application/javascript",
+        ".json": "application/json",
+        ".png": "image/png",
+        ".jpg": "image/jpeg",
+        ".jpeg": "image/jpeg",
+        ".gif": "image/gif",
+        ".svg": "image/svg+xml",
+        ".pdf": "application/pdf",
+        ".mp4": "video/mp4",
+        ".mp3": "audio/mpeg",
+        ".wav": "audio/wav",
+    }
+)
+
+
+@functools.lru_cache(maxsize=128)
+def media_type_for_suffix(suffix: str) -> str:
+    """Media type for a lowercase file suffix (e.g. ".png")."""
+    media_type = MEDIA_TYPES.get(suffix)
+    if media_type is None:
+        media_type = mimetypes.guess_type(f"file{suffix}", strict=False)[0] or "application/octet-stream"
+    return media_type
+
+
+# Absolute .md links in llms.txt content: [Title](https://host/page.md#anchor)
+_MD_LINK_RE = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+\.md(?:#[^)]*)?)\)")
+
+# Base URLs derived from requests, keyed by the scope values they depend on.
+# Bounded because the Host header is client-controlled.
+_base_url_cache: dict[tuple, str] = {}
+_BASE_URL_CACHE_SIZE = 64
+
+
+def _request_base_url(request: Request) -> str:
+    """
+    Base URL for absolute links: settings.BASE_URL, or derived from the request.
+    Derived values respect X-Forwarded-Proto from reverse proxies that terminate SSL
+    and are cached per scheme/host/root_path, so a fixed proxy pays for it once.
+    """
+    if settings.BASE_URL:
+        return settings.BASE_URL
+
+    forwarded_proto = request.headers.get("x-forwarded-proto", "")
+    key = (
+        request.scope.get("scheme"),
+        request.headers.get("host"),
+        tuple(request.scope.get("server") or ()),
+        request.scope.get("root_path", ""),
+        forwarded_proto,
+    )
+    base_url = _base_url_cache.get(key)
+    if base_url is None:
+        base_url = str(request.base_url).rstrip("/")
+        if forwarded_proto == "https" and base_url.startswith("http://"):
+            base_url = "https://" + base_url[7:]
+        if len(_base_url_cache) >= _BASE_URL_CACHE_SIZE:
+            _base_url_cache.clear()
+        _base_url_cache[key] = base_url
+    return base_url
+
+
+@contextmanager
+def _file_lock(lock_path: Path):
+    """
+    Hold an exclusive advisory lock on lock_path.
+    Serializes startup work across uvicorn worker processes; a no-op where
+    fcntl is unavailable or the lock file cannot be created.
+    """
+    lock_file = None
+    if fcntl is not None:
+        try:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = open(lock_path, "a")
+        except OSError as e:
+            logger.debug(f"Could not open lock file {lock_path}: {e}")
+    if lock_file is None:
+        yield
+        return
+
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events.
-    Handles MCP search index initialization and cleanup.
+    Handles stale cache cleanup, the docs watcher and MCP search index initialization and cleanup.
     """
     # Startup
+    # Caches retired at import time are deleted off the event loop so startup doesn't wait on them
+    purge_task = asyncio.create_task(asyncio.to_thread(settings.purge_stale_caches))
+    watcher_stop = asyncio.Event()
+    watcher_task = asyncio.create_task(watch_docs(watcher_stop)) if settings.WATCH_DOCS else None
+
     if settings.MCP_ENABLED:
         try:
             from .mcp import get_index_manager
 
             manager = get_index_manager()
-            success = await manager.initialize()
+            # One worker builds the index at a time; the others then load it from cache
+            with _file_lock(settings.CACHE_ROOT / "mcp" / "index.lock"):
+                success = await manager.initialize()
 
             if success:
                 logger.info(f"🔍 MCP search index ready ({manager.get_backend().get_doc_count()} docs)")
@@ -73,6 +242,11 @@ async def lifespan(app: FastAPI):
     yield  # Application runs here
 
     # Shutdown
+    if watcher_task:
+        watcher_stop.set()
+        await watcher_task
+    await purge_task
+
     if settings.MCP_ENABLED:
         try:
             from .mcp import get_index_manager
@@ -91,8 +265,14 @@ app = FastAPI(
     version=__version__,
     debug=settings.DEBUG,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Compress dynamic responses on the fly. Cached pages and llms files are served
+# precompressed with Content-Encoding set, and images/fonts are excluded, so the
+# middleware passes those through untouched.
+app.add_middleware(VaryMergingGZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # Add rate limiter to app state
 app.state.limiter = limiter
 
@@ -120,7 +300,7 @@ async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
         f"[MCP] rate limit exceeded ip={ip} limit={settings.MCP_RATE_LIMIT_REQUESTS}/{settings.MCP_RATE_LIMIT_WINDOW}s"
     )
 
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=429,
         content={
             "jsonrpc": "2.0",
@@ -151,8 +331,8 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "docs_root": str(settings.DOCS_ROOT.absolute()),
-        "cache_root": str(settings.CACHE_ROOT.absolute()),
+        "docs_root": settings.DOCS_ROOT_ABS,
+        "cache_root": settings.CACHE_ROOT_ABS,
         "debug": settings.DEBUG,
         "mcp_enabled": settings.MCP_ENABLED,
     }
@@ -167,7 +347,7 @@ async def servemd_about(request: Request):
     Cursor, VS Code, and Claude Desktop. Not indexed by the Whoosh search engine
     because it is not under DOCS_ROOT.
     """
-    base_url = settings.BASE_URL if settings.BASE_URL else str(request.base_url).rstrip("/")
+    base_url = _request_base_url(request)
     navigation = parse_sidebar_navigation()
     topbar_sections = parse_topbar_links()
 
@@ -199,7 +379,7 @@ async def mcp_endpoint(request: Request):
     Handles JSON-RPC 2.0 requests from LLM clients.
 
     Rate limited to MCP_RATE_LIMIT_REQUESTS per MCP_RATE_LIMIT_WINDOW seconds.
-    Default: 120 requests per 60 seconds per IP.
+    Default: 120 requests per 60 seconds per IP, counted per worker process.
 
     Supports:
     - initialize: Handshake and capability negotiation
@@ -207,7 +387,7 @@ async def mcp_endpoint(request: Request):
     - tools/call: Execute a tool (search_docs, get_doc_page, list_doc_pages)
     """
     if not settings.MCP_ENABLED:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=404,
             content={"error": "MCP endpoint is disabled"},
         )
@@ -216,7 +396,7 @@ async def mcp_endpoint(request: Request):
         body = await request.json()
     except Exception as e:
         logger.warning(f"MCP: Invalid JSON in request: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "jsonrpc": "2.0",
                 "id": None,
@@ -235,7 +415,7 @@ async def mcp_endpoint(request: Request):
     request_id = body.get("id", "none")
     logger.info(f"[MCP] method={method} id={request_id}")
     result = await handle_request(body)
-    return JSONResponse(content=result)
+    return FastJSONResponse(content=result)
 
 
 @app.get("/llms.txt")
@@ -251,11 +431,11 @@ async def serve_llms_txt(request: Request):
     cached = await get_cached_llms(cache_file)
     if cached:
         logger.debug("Serving cached llms.txt")
-        return PlainTextResponse(content=cached, media_type="text/plain; charset=utf-8")
+        return _cached_llms_response(request, cache_file, cached)
 
     try:
         # Get base URL from environment or request
-        base_url = settings.BASE_URL if settings.BASE_URL else str(request.base_url).rstrip("/")
+        base_url = _request_base_url(request)
 
         # Generate content using helper function
         result = await generate_llms_txt_content(base_url)
@@ -271,37 +451,71 @@ async def serve_llms_txt(request: Request):
         raise HTTPException(status_code=500, detail="Error generating llms.txt") from e
 
 
+def _read_llms_page(file_path: str) -> str | None:
+    """Read a page linked from llms.txt. Returns None if the file does not exist."""
+    if not os.path.isfile(file_path):
+        return None
+    with open(file_path, encoding="utf-8") as f:
+        return f.read()
+
+
+async def _llms_full_chunks(llms_content: str, pages: list[tuple[str, str]]) -> AsyncIterator[str]:
+    """
+    Yield llms-full.txt piece by piece: the index, then each linked page.
+    Pages are read concurrently in worker threads and emitted in link order.
+    """
+    docs_root = settings.DOCS_ROOT_ABS
+    reads = [
+        asyncio.ensure_future(asyncio.to_thread(_read_llms_page, os.path.join(docs_root, rel_path)))
+        for _url, rel_path in pages
+    ]
+    try:
+        yield llms_content + "\n\n"
+        for (url, rel_path), read in zip(pages, reads, strict=True):
+            try:
+                page_content = await read
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Error reading {rel_path}: {e}")
+                continue
+            if page_content is None:
+                logger.debug(f"File not found for llms-full.txt: {rel_path}")
+                continue
+            yield f"\n<url>{url}</url>\n<content>\n{page_content}\n</content>\n"
+            logger.debug(f"Added to llms-full.txt: {rel_path}")
+    finally:
+        # Client went away mid-stream: drop reads that haven't been consumed
+        for read in reads:
+            read.cancel()
+
+
 @app.get("/llms-full.txt")
 async def serve_llms_full_txt(request: Request):
     """
     Serve llms-full.txt: expanded version with all linked content.
     Uses XML-style structure for LLM consumption (Claude format).
+
+    Freshly generated content is streamed page by page and cached once the
+    whole document has been sent.
     """
     # Check cache first
     cache_file = "llms-full.txt"
     cached = await get_cached_llms(cache_file)
     if cached:
         logger.debug("Serving cached llms-full.txt")
-        return PlainTextResponse(content=cached, media_type="text/plain; charset=utf-8")
+        return _cached_llms_response(request, cache_file, cached)
 
     try:
         # Get base URL from environment or request
-        base_url = settings.BASE_URL if settings.BASE_URL else str(request.base_url).rstrip("/")
+        base_url = _request_base_url(request)
 
         # Generate llms.txt content using helper function
         llms_content = await generate_llms_txt_content(base_url)
 
-        # Parse all .md links (both absolute and relative)
-        # Pattern matches absolute URLs with .md extension
-        pattern = r"\[([^\]]+)\]\((https?://[^)]+\.md(?:#[^)]*)?)\)"
-        links = re.findall(pattern, llms_content)
-
-        # Start with the index content
-        result = llms_content + "\n\n"
-
-        # Fetch and append each linked page
+        # Collect each absolute .md link once, in order of appearance
+        pages: list[tuple[str, str]] = []
         seen_urls = set()
-        for _title, url in links:
+        for match in _MD_LINK_RE.finditer(llms_content):
+            url = match.group(2)
             if url in seen_urls:
                 continue
             seen_urls.add(url)
@@ -310,29 +524,34 @@ async def serve_llms_full_txt(request: Request):
             # Remove the base_url prefix and any anchor
             rel_path = url.replace(base_url + "/", "").replace(base_url, "").lstrip("/")
             rel_path = rel_path.split("#")[0]  # Remove anchor
+            if not is_safe_path(rel_path, settings.DOCS_ROOT):
+                logger.warning(f"Skipping llms-full.txt link outside DOCS_ROOT: {url}")
+                continue
+            pages.append((url, rel_path))
 
-            file_path = settings.DOCS_ROOT / rel_path
+    except Exception as e:
+        logger.error(f"Error generating llms-full.txt: {e}")
+        raise HTTPException(status_code=500, detail="Error generating llms-full.txt") from e
 
-            if file_path.exists():
-                try:
-                    page_content = file_path.read_text(encoding="utf-8")
-                    result += f"\n<url>{url}</url>\n<content>\n{page_content}\n</content>\n"
-                    logger.debug(f"Added to llms-full.txt: {rel_path}")
-                except (OSError, UnicodeDecodeError) as e:
-                    logger.warning(f"Error reading {rel_path}: {e}")
-                    continue
-            else:
-                logger.debug(f"File not found for llms-full.txt: {rel_path}")
+    # Tee the stream so the complete document can be cached after the response
+    parts: list[str] = []
+    complete = False
 
-        # Cache the result
-        await save_cached_llms(cache_file, result)
+    async def stream() -> AsyncIterator[str]:
+        nonlocal complete
+        async for chunk in _llms_full_chunks(llms_content, pages):
+            parts.append(chunk)
+            yield chunk
+        complete = True
 
-        logger.info(f"Generated and cached llms-full.txt with {len(seen_urls)} pages")
-        return PlainTextResponse(content=result, media_type="text/plain; charset=utf-8")
+    async def save() -> None:
+        if not complete:
+            logger.debug("llms-full.txt stream interrupted: not caching")
+            return
+        await save_cached_llms(cache_file, "".join(parts))
+        logger.info(f"Generated and cached llms-full.txt with {len(pages)} pages")
 
-    except Exception as e:
-        logger.error(f"Error generating llms-full.txt: {e}")
-        raise HTTPException(status_code=500, detail="Error generating llms-full.txt") from e
+    return StreamingResponse(stream(), media_type="text/plain; charset=utf-8", background=BackgroundTask(save))
 
 
 @app.get("/")
@@ -365,14 +584,14 @@ async def search_page(q: str = "", format: str = ""):
     return await _search_html_response(query)
 
 
-async def _search_json_response(query: str) -> JSONResponse:
+async def _search_json_response(query: str) -> FastJSONResponse:
     """Return search results as JSON with a pre-rendered HTML fragment."""
     if not query:
-        return JSONResponse(content={"query": "", "count": 0, "results": [], "html": ""})
+        return FastJSONResponse(content={"query": "", "count": 0, "results": [], "html": ""})
 
     # Check availability
     if not settings.MCP_ENABLED:
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "query": query,
                 "count": 0,
@@ -386,7 +605,7 @@ async def _search_json_response(query: str) -> JSONResponse:
 
         manager = get_index_manager()
         if not manager.is_initialized:
-            return JSONResponse(
+            return FastJSONResponse(
                 content={
                     "query": query,
                     "count": 0,
@@ -396,7 +615,7 @@ async def _search_json_response(query: str) -> JSONResponse:
             )
     except Exception as e:
         logger.warning(f"Search index check failed: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "query": query,
                 "count": 0,
@@ -411,7 +630,7 @@ async def _search_json_response(query: str) -> JSONResponse:
         results = search_docs(query=query)
     except RuntimeError as e:
         logger.warning(f"Search failed: {e}")
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "query": query,
                 "count": 0,
@@ -434,7 +653,7 @@ async def _search_json_response(query: str) -> JSONResponse:
         }
         for r in results
     ]
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "query": query,
             "count": len(results),
@@ -526,6 +745,123 @@ async def serve_custom_css():
     )
 
 
+def _is_not_modified(response_headers: Headers, request_headers: Headers) -> bool:
+    """
+    Check the conditional request headers (If-None-Match / If-Modified-Since)
+    against the ETag and Last-Modified of a response.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison (RFC 9110 13.1.2)
+        etag = response_headers.get("etag", "").removeprefix("W/")
+        return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+    if_modified_since = request_headers.get("if-modified-since")
+    last_modified = response_headers.get("last-modified")
+    if if_modified_since and last_modified:
+        since = parsedate(if_modified_since)
+        modified = parsedate(last_modified)
+        return since is not None and modified is not None and since >= modified
+
+    return False
+
+
+def _file_response(
+    request: Request,
+    file_path: Path,
+    media_type: str,
+    headers: dict[str, str] | None = None,
+    filename: str | None = None,
+) -> FileResponse | NotModifiedResponse:
+    """
+    Stream a file from disk with ETag/Last-Modified headers.
+    Returns 304 Not Modified when the client's cached copy is still current.
+    """
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError as e:
+        # Deleted after get_file_path() found it (e.g. before the watcher caught up)
+        raise HTTPException(status_code=404, detail="File not found") from e
+    response = FileResponse(
+        path=str(file_path),
+        media_type=media_type,
+        headers=headers,
+        filename=filename,
+        stat_result=stat_result,
+    )
+    # GZipMiddleware may compress the body on the fly; a strong ETag would then be
+    # shared by two different representations, so it is marked weak
+    etag = response.headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        response.headers["etag"] = f"W/{etag}"
+    if _is_not_modified(response.headers, request.headers):
+        return NotModifiedResponse(response.headers)
+    return response
+
+
+def _accepted_encodings(request: Request) -> list[str]:
+    """
+    Precompressed encodings ("br", "gzip") accepted by the client, in order of preference.
+    """
+    accepted = set()
+    refused = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            is_refused = bool(q) and float(q) == 0
+        except ValueError:
+            continue
+        (refused if is_refused else accepted).add(coding.strip().lower())
+    # "*" covers only codings not listed explicitly, so a refused coding stays refused
+    return [
+        encoding
+        for encoding in PRECOMPRESSED_SUFFIXES
+        if encoding in accepted or ("*" in accepted and encoding not in refused)
+    ]
+
+
+def _cached_llms_response(request: Request, cache_file: str, content: str) -> Response:
+    """
+    Serve a cached llms file, using its precompressed sibling when the client accepts it.
+    """
+    for encoding in _accepted_encodings(request):
+        variant_path = get_cached_llms_variant(cache_file, encoding)
+        if not variant_path:
+            continue
+        try:
+            stat_result = os.stat(variant_path)
+        except FileNotFoundError:
+            # Invalidated by the watcher since the lookup
+            continue
+        return FileResponse(
+            path=str(variant_path),
+            media_type="text/plain; charset=utf-8",
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            stat_result=stat_result,
+        )
+    return PlainTextResponse(
+        content=content, media_type="text/plain; charset=utf-8", headers={"Vary": "Accept-Encoding"}
+    )
+
+
+def _cached_html_response(request: Request, entry: CachedHtml) -> HTMLResponse | NotModifiedResponse:
+    """
+    Serve a cached page with its ETag/Last-Modified headers.
+    Returns 304 Not Modified when the client's cached copy is still current.
+    """
+    encoding = next((enc for enc in _accepted_encodings(request) if enc in entry.encoded), None)
+    headers = {"ETag": entry.etag_for(encoding), "Last-Modified": entry.last_modified, "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    response = HTMLResponse(content=entry.encoded[encoding] if encoding else entry.content, headers=headers)
+    if _is_not_modified(response.headers, request.headers):
+        return NotModifiedResponse(response.headers)
+    return response
+
+
 def _serve_html_in_iframe(path: str, file_path: Path) -> HTMLResponse:
     """Wrap a raw HTML file from DOCS_ROOT in the doc template via an iframe."""
     navigation = parse_sidebar_navigation()
@@ -558,7 +894,7 @@ def _serve_html_in_iframe(path: str, file_path: Path) -> HTMLResponse:
 
 
 @app.get("/raw/{path:path}")
-async def serve_raw_file(path: str):
+async def serve_raw_file(path: str, request: Request):
     """
     Serve a file from DOCS_ROOT as-is, without template wrapping.
     Used by the iframe embed for HTML files to avoid recursive template rendering.
@@ -568,19 +904,7 @@ async def serve_raw_file(path: str):
         raise HTTPException(status_code=404, detail="File not found")
 
     suffix = file_path.suffix.lower()
-    media_types = {
-        ".html": "text/html; charset=utf-8",
-        ".htm": "text/html; charset=utf-8",
-        ".css": "text/css",
-        ".js": "application/javascript",
-        ".json": "application/json",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".svg": "image/svg+xml",
-    }
-    media_type = media_types.get(suffix, "application/octet-stream")
+    media_type = media_type_for_suffix(suffix)
 
     headers = {}
     if suffix in (".html", ".htm"):
@@ -588,7 +912,7 @@ async def serve_raw_file(path: str):
 
     safe_log_path = path.replace("\r", "").replace("\n", "")
     logger.debug(f"Serving raw file: {safe_log_path} ({media_type})")
-    return FileResponse(path=str(file_path), media_type=media_type, headers=headers)
+    return _file_response(request, file_path, media_type, headers=headers)
 
 
 @app.get("/{path:path}")
@@ -610,29 +934,31 @@ async def serve_content(path: str, request: Request, highlight: str = ""):
         if not file_path:
             # Fallback: check if a raw .html file exists in DOCS_ROOT
             html_file_path = get_file_path(path)
-            if html_file_path:
+            # Lookups may be cached while the watcher runs; make sure the file is still there
+            if html_file_path and os.path.isfile(html_file_path):
                 return _serve_html_in_iframe(path, html_file_path)
             raise HTTPException(status_code=404, detail="File not found")
 
         # Check cache first — skip if highlight parameter present
         if not highlight:
-            cached_html = await get_cached_html(file_path)
+            cached_html = await get_cached_html_entry(file_path)
             if cached_html:
                 safe_log_path = path.replace("\r", "").replace("\n", "")
                 logger.debug(f"Serving cached HTML: {safe_log_path}")
-                return HTMLResponse(content=cached_html)
+                return _cached_html_response(request, cached_html)
 
         # Read and render markdown
         try:
             markdown_content = file_path.read_text(encoding="utf-8")
-            html_content = await render_markdown_to_html(markdown_content, file_path)
+            rendered = await render_markdown(markdown_content, file_path)
+            html_content = rendered.html
 
             # Parse navigation
             navigation = parse_sidebar_navigation()
             topbar_sections = parse_topbar_links()
 
-            # Extract table of contents from the rendered HTML
-            toc_items = extract_table_of_contents(html_content)
+            # Table of contents collected while rendering
+            toc_items = rendered.toc_items
 
             # Create full HTML document with styling and navigation
             title = f"{file_path.stem.replace('_', ' ').title()} - Documentation"
@@ -642,14 +968,7 @@ async def serve_content(path: str, request: Request, highlight: str = ""):
             current_doc_path = path[:-5] if path.endswith(".html") else path  # e.g. features/mcp
 
             # Build page actions (Copy page dropdown with AI links)
-            if settings.BASE_URL:
-                base_url = settings.BASE_URL
-            else:
-                base_url = str(request.base_url).rstrip("/")
-                # Respect X-Forwarded-Proto from reverse proxies that terminate SSL
-                forwarded_proto = request.headers.get("x-forwarded-proto", "")
-                if forwarded_proto == "https" and base_url.startswith("http://"):
-                    base_url = "https://" + base_url[7:]
+            base_url = _request_base_url(request)
             raw_md_url = f"{base_url}/{current_doc_path}.md"
             page_url = f"{base_url}{current_path}" if current_path.startswith("/") else f"{base_url}/{current_path}"
             page_actions = {
@@ -675,14 +994,19 @@ async def serve_content(path: str, request: Request, highlight: str = ""):
                 highlight_term=highlight,
             )
 
+            safe_log_path = path.replace("\r", "").replace("\n", "")
+            logger.info("Rendered: %s", safe_log_path)
+
             # Cache the rendered HTML only for non-highlighted views
             if not highlight:
-                await save_cached_html(file_path, full_html)
+                cached_html = await save_cached_html(file_path, full_html)
+                return _cached_html_response(request, cached_html)
 
-            safe_log_path = path.replace("\r", "").replace("\n", "")
-            logger.info("Rendered: %s", safe_log_path)
             return HTMLResponse(content=full_html)
 
+        except FileNotFoundError as e:
+            # Deleted after get_file_path() found it (e.g. before the watcher caught up)
+            raise HTTPException(status_code=404, detail="File not found") from e
         except (OSError, UnicodeDecodeError) as e:
             logger.error(f"Error reading file {file_path}: {e}")
             raise HTTPException(status_code=500, detail=f"Error reading file: {str(e)}") from e
@@ -695,10 +1019,9 @@ async def serve_content(path: str, request: Request, highlight: str = ""):
             raise HTTPException(status_code=404, detail="File not found")
 
         try:
-            content = file_path.read_text(encoding="utf-8")
             logger.debug("Serving raw markdown: %s", path.replace("\r", "").replace("\n", ""))
-            return PlainTextResponse(content=content, media_type="text/markdown")
-        except (OSError, UnicodeDecodeError) as e:
+            return _file_response(request, file_path, "text/markdown; charset=utf-8")
+        except OSError as e:
             logger.error(f"Error reading file {file_path}: {e}")
             raise HTTPException(status_code=500, detail=f"Error reading file: {str(e)}") from e
 
@@ -710,29 +1033,17 @@ async def serve_content(path: str, request: Request, highlight: str = ""):
             raise HTTPException(status_code=404, detail="File not found")
 
         # Determine media type based on extension
-        suffix = file_path.suffix.lower()
-        media_types = {
-            ".png": "image/png",
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".gif": "image/gif",
-            ".svg": "image/svg+xml",
-            ".pdf": "application/pdf",
-            ".mp4": "video/mp4",
-            ".mp3": "audio/mpeg",
-            ".wav": "audio/wav",
-        }
-
-        media_type = media_types.get(suffix, "application/octet-stream")
+        media_type = media_type_for_suffix(file_path.suffix.lower())
 
         logger.debug("Serving asset: %s (%s)", path.replace("\r", "").replace("\n", ""), media_type)
-        return FileResponse(path=str(file_path), media_type=media_type, filename=file_path.name)
+        return _file_response(request, file_path, media_type, filename=file_path.name)
 
 
 def main():
     """Main entry point for the application"""
     import argparse
     import sys
+    import threading
 
     import uvicorn
 
@@ -755,15 +1066,30 @@ def main():
     logger.info(f"   - http://localhost:{settings.PORT}/index.md (raw markdown)")
     logger.info(f"   - http://localhost:{settings.PORT}/health")
 
-    uvicorn.run(
-        "docs_server.main:app",
-        host="0.0.0.0",
-        port=settings.PORT,
-        reload=settings.DEBUG,
-        log_level="debug" if settings.DEBUG else "info",
-        proxy_headers=True,
-        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
-    )
+    # This process validated the cache on import; delete retired caches here so that
+    # worker processes started by uvicorn neither repeat that work nor race on it
+    threading.Thread(target=settings.purge_stale_caches, name="purge-stale-caches", daemon=True).start()
+
+    # Reload mode supports a single worker only
+    workers = None if settings.DEBUG else settings.WORKERS
+    # Worker processes skip cache validation; reloads must not, so DEBUG still clears the cache
+    mark_prepared = workers is not None and workers > 1
+    if mark_prepared:
+        os.environ[CACHE_PREPARED_ENV] = "1"
+    try:
+        uvicorn.run(
+            "docs_server.main:app",
+            host="0.0.0.0",
+            port=settings.PORT,
+            reload=settings.DEBUG,
+            workers=workers,
+            log_level="debug" if settings.DEBUG else "info",
+            proxy_headers=True,
+            forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        )
+    finally:
+        if mark_prepared:
+            os.environ.pop(CACHE_PREPARED_ENV, None)
 
 
 if __name__ == "__main__":
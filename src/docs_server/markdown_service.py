@@ -1,32 +1,220 @@
 """
 Markdown processing service for ServeMD Documentation Server.
 Handles markdown-to-HTML conversion with extensions.
+
+The parser is selected with the MD_BACKEND setting:
+- markdown: Python-Markdown with the full extension set from config (default)
+- cmarkgfm: GitHub-flavored CommonMark via the cmark-gfm C library
+- mistune: mistune with table/footnote/task-list/def-list/abbr plugins
+
+The faster backends are optional dependencies; when the configured one is not
+installed we fall back to Python-Markdown.
+
+Every backend also returns the page's table of contents, collected while
+rendering, so it never has to be scraped back out of the HTML.
 """
 
+import html
 import logging
+import queue
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 import markdown
+from markdown.extensions import Extension
+from markdown.extensions.toc import remove_fnrefs, render_inner_html, slugify, strip_tags, unique
+from markdown.treeprocessors import Treeprocessor
 
 from .config import settings
 from .helpers import convert_md_links_to_html
+from .pygments_cache import install_highlight_caches
+
+try:
+    import cmarkgfm
+    from cmarkgfm.cmark import Options as CmarkOptions
+except ImportError:  # Optional dependency
+    cmarkgfm = None
+
+try:
+    import mistune
+except ImportError:  # Optional dependency
+    mistune = None
 
 logger = logging.getLogger(__name__)
 
+# Memoize Pygments lexer/formatter lookups used by codehilite and pymdownx.highlight
+install_highlight_caches()
 
-async def render_markdown_to_html(content: str, file_path: Path) -> str:
+# Bare headings as emitted by cmarkgfm/mistune (no id attribute yet)
+_BARE_HEADING_RE = re.compile(r"<h([1-6])>(.*?)</h\1>", re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+_mistune_md = None
+_warned_backends: set[str] = set()
+
+# Idle Python-Markdown instances. Building one registers every extension, which is
+# far more expensive than a reset(), so instances are reused across renders.
+# An instance is never shared: each render takes one out of the pool (or builds a
+# new one when the pool is empty) and puts it back afterwards.
+_md_pool: queue.SimpleQueue[markdown.Markdown] = queue.SimpleQueue()
+
+
+@dataclass(frozen=True)
+class RenderedMarkdown:
+    """Rendered HTML and its table of contents ({"id", "title", "level"} items)."""
+
+    html: str
+    toc_items: list[dict[str, Any]] = field(default_factory=list)
+
+
+def get_markdown_backend() -> str:
     """
-    Render markdown content to HTML with all extensions and link conversion.
+    Return the markdown backend that will actually be used.
+    Falls back to "markdown" when the configured backend is not installed.
+    """
+    backend = settings.MD_BACKEND
+    available = {"cmarkgfm": cmarkgfm is not None, "mistune": mistune is not None}
+    if not available.get(backend, True):
+        if backend not in _warned_backends:
+            _warned_backends.add(backend)
+            logger.warning(f"MD_BACKEND={backend} but {backend} is not installed, using Python-Markdown")
+        return "markdown"
+    return backend
+
+
+def add_heading_ids(html_content: str, toc_items: list[dict[str, Any]] | None = None) -> str:
+    """
+    Add id attributes (and permalinks) to headings rendered by the fast backends.
+
+    Mirrors the output of Python-Markdown's toc extension so that in-page
+    anchors keep working. Every heading (h1-h6) is appended to toc_items.
+    """
+    toc_config = settings.markdown_extension_configs.get("toc", {})
+    permalink = toc_config.get("permalink", False)
+    permalink_title = toc_config.get("permalink_title", "Permanent link")
+    used_ids: set[str] = set()
+
+    def replace_heading(match: re.Match[str]) -> str:
+        level, inner = match.groups()
+        title = _TAG_RE.sub("", inner)
+        text = html.unescape(title)
+        heading_id = unique(slugify(text, "-"), used_ids)
+        if toc_items is not None:
+            toc_items.append({"id": heading_id, "title": title.strip(), "level": int(level)})
+        anchor = ""
+        if permalink:
+            anchor = f'<a class="headerlink" href="#{heading_id}" title="{permalink_title}">&para;</a>'
+        return f'<h{level} id="{heading_id}">{inner}{anchor}</h{level}>'
+
+    return _BARE_HEADING_RE.sub(replace_heading, html_content)
+
+
+def _render_with_cmarkgfm(content: str) -> str:
+    """Render GitHub-flavored markdown with the cmark-gfm C library."""
+    return cmarkgfm.github_flavored_markdown_to_html(content, options=CmarkOptions.CMARK_OPT_UNSAFE)
+
+
+def _render_with_mistune(content: str) -> str:
+    """Render markdown with a module-level mistune instance."""
+    global _mistune_md
+    if _mistune_md is None:
+        _mistune_md = mistune.create_markdown(
+            escape=False, plugins=["table", "footnotes", "task_lists", "def_list", "abbr", "strikethrough"]
+        )
+    return _mistune_md(content)
+
+
+class _HeadingCollector(Treeprocessor):
+    """Record every heading element and its title, ahead of the toc extension."""
+
+    def run(self, root) -> None:
+        for el in root.iter():
+            if isinstance(el.tag, str) and len(el.tag) == 2 and el.tag[0] == "h" and el.tag[1] in "123456":
+                # Same title text the toc extension derives, before it appends a permalink
+                title = strip_tags(render_inner_html(remove_fnrefs(el), self.md))
+                self.md.heading_elements.append((el, title))
+
+
+class _HeadingCollectorExtension(Extension):
+    """
+    Collect all headings for the page TOC.
+
+    The toc extension's toc_tokens only cover toc_depth; the sidebar lists h1-h6.
+    Ids are read after conversion, once the toc extension has assigned them.
+    """
+
+    def extendMarkdown(self, md: markdown.Markdown) -> None:
+        md.registerExtension(self)
+        self.md = md
+        md.heading_elements = []
+        # After inline processing (20), before the toc extension (5)
+        md.treeprocessors.register(_HeadingCollector(md), "servemd_headings", 6)
+
+    def reset(self) -> None:
+        self.md.heading_elements = []
+
+
+def _acquire_markdown() -> markdown.Markdown:
+    """Take an idle Markdown instance from the pool or build a new one."""
+    try:
+        return _md_pool.get_nowait()
+    except queue.Empty:
+        return markdown.Markdown(
+            extensions=[*settings.markdown_extensions, _HeadingCollectorExtension()],
+            extension_configs=settings.markdown_extension_configs,
+        )
+
+
+def _release_markdown(md: markdown.Markdown) -> None:
+    """Reset a Markdown instance and return it to the pool."""
+    md.reset()
+    _md_pool.put(md)
+
+
+def _collected_toc_items(md: markdown.Markdown) -> list[dict[str, Any]]:
+    """TOC items for the headings collected during md.convert(), in document order."""
+    return [
+        {"id": el.get("id"), "title": title, "level": int(el.tag[1])}
+        for el, title in md.heading_elements
+        if el.get("id")
+    ]
+
+
+def _render_with_python_markdown(content: str) -> RenderedMarkdown:
+    """Render markdown with Python-Markdown and the configured extensions."""
+    md = _acquire_markdown()
+    try:
+        html_content = md.convert(content)
+        # Read before release: reset() clears the collected headings
+        return RenderedMarkdown(html_content, _collected_toc_items(md))
+    finally:
+        _release_markdown(md)
+
+
+async def render_markdown(content: str, file_path: Path) -> RenderedMarkdown:
+    """
+    Render markdown content to HTML with all extensions and link conversion,
+    together with its table of contents.
     """
     # Convert .md links to .html for rendered mode
     processed_content = convert_md_links_to_html(content)
 
-    # Initialize markdown processor
-    md = markdown.Markdown(
-        extensions=settings.markdown_extensions, extension_configs=settings.markdown_extension_configs
-    )
+    # Render to HTML with the configured backend
+    backend = get_markdown_backend()
+    if backend == "markdown":
+        return _render_with_python_markdown(processed_content)
+
+    render = _render_with_cmarkgfm if backend == "cmarkgfm" else _render_with_mistune
+    toc_items: list[dict[str, Any]] = []
+    html_content = add_heading_ids(render(processed_content), toc_items)
+    return RenderedMarkdown(html_content, toc_items)
 
-    # Render to HTML
-    html_content = md.convert(processed_content)
 
-    return html_content
+async def render_markdown_to_html(content: str, file_path: Path) -> str:
+    """
+    Render markdown content to HTML with all extensions and link conversion.
+    """
+    rendered = await render_markdown(content, file_path)
+    return rendered.html
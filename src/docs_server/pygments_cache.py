@@ -0,0 +1,112 @@
+"""
+Pygments lexer and formatter caching for ServeMD Documentation Server.
+
+codehilite and pymdownx.highlight look up a lexer and build a new HTML
+formatter for every code block. Both are pure functions of their options,
+so we memoize them and patch the cached versions into those extensions.
+"""
+
+import functools
+import logging
+from typing import Any
+
+from pygments.formatters import get_formatter_by_name
+from pygments.lexers import get_lexer_by_name
+
+logger = logging.getLogger(__name__)
+
+_CACHE_SIZE = 256
+
+
+def _freeze(value: Any) -> Any:
+    """Convert list/dict/set option values into hashable equivalents."""
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set | frozenset):
+        return frozenset(value)
+    return value
+
+
+def _options_key(options: dict[str, Any]) -> tuple | None:
+    """Build a hashable cache key from keyword options, or None if not possible."""
+    try:
+        key = tuple(sorted((k, _freeze(v)) for k, v in options.items()))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _lexer_from_key(alias: str, key: tuple) -> Any:
+    return get_lexer_by_name(alias, **dict(key))
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _named_formatter_from_key(alias: str, key: tuple) -> Any:
+    return get_formatter_by_name(alias, **dict(key))
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _formatter_from_key(formatter_class: type, key: tuple) -> Any:
+    return formatter_class(**dict(key))
+
+
+def cached_get_lexer_by_name(_alias: str, **options: Any) -> Any:
+    """Drop-in replacement for pygments.lexers.get_lexer_by_name with an LRU cache."""
+    key = _options_key(options)
+    if key is None:
+        return get_lexer_by_name(_alias, **options)
+    return _lexer_from_key(_alias, key)
+
+
+def cached_get_formatter_by_name(_alias: str, **options: Any) -> Any:
+    """Drop-in replacement for pygments.formatters.get_formatter_by_name with an LRU cache."""
+    key = _options_key(options)
+    if key is None:
+        return get_formatter_by_name(_alias, **options)
+    return _named_formatter_from_key(_alias, key)
+
+
+def cached_formatter_class(formatter_class: type) -> Any:
+    """Wrap a formatter class so that instances are reused per option set."""
+
+    def build(**options: Any) -> Any:
+        key = _options_key(options)
+        if key is None:
+            return formatter_class(**options)
+        return _formatter_from_key(formatter_class, key)
+
+    build.__wrapped__ = formatter_class
+    return build
+
+
+def install_highlight_caches() -> None:
+    """
+    Patch the cached lookups into codehilite and pymdownx.highlight.
+    Safe to call more than once.
+    """
+    from markdown.extensions import codehilite
+    from pymdownx import highlight
+
+    if getattr(codehilite, "pygments", False):
+        codehilite.get_lexer_by_name = cached_get_lexer_by_name
+        codehilite.get_formatter_by_name = cached_get_formatter_by_name
+
+    if getattr(highlight, "pygments", False):
+        highlight.get_lexer_by_name = cached_get_lexer_by_name
+        for name in ("BlockHtmlFormatter", "InlineHtmlFormatter"):
+            formatter_class = getattr(highlight, name)
+            if not hasattr(formatter_class, "__wrapped__"):
+                setattr(highlight, name, cached_formatter_class(formatter_class))
+
+    logger.debug("Installed Pygments lexer/formatter caches")
+
+
+def clear_highlight_caches() -> None:
+    """Drop all cached lexers and formatters."""
+    _lexer_from_key.cache_clear()
+    _named_formatter_from_key.cache_clear()
+    _formatter_from_key.cache_clear()
@@ -0,0 +1,84 @@
+"""
+Docs watcher for ServeMD Documentation Server.
+Invalidates cached content when files under DOCS_ROOT change.
+
+Cache reads never check the source files; instead this watcher reacts to
+writes, so idle requests cost nothing and edits show up immediately.
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+from .caching import clear_cached_html, invalidate_cached_html, invalidate_cached_llms
+from .config import settings
+from .helpers import clear_file_path_cache, clear_navigation_cache, set_file_path_cache_enabled
+
+logger = logging.getLogger(__name__)
+
+# Files rendered into every page: a change invalidates all cached HTML
+NAVIGATION_FILES = ("sidebar.md", "topbar.md")
+
+
+def handle_docs_changes(changed_paths: Iterable[str | Path]) -> None:
+    """
+    Invalidate caches for a batch of changed paths under DOCS_ROOT.
+    """
+    docs_root = Path(settings.DOCS_ROOT_ABS)
+    cache_root = Path(settings.CACHE_ROOT_ABS)
+
+    relative_paths: list[Path] = []
+    for changed in changed_paths:
+        path = Path(changed).resolve()
+        if path.is_relative_to(cache_root):
+            continue
+        try:
+            relative_paths.append(path.relative_to(docs_root))
+        except ValueError:
+            continue
+
+    if not relative_paths:
+        return
+
+    # Files may have been created or deleted
+    clear_file_path_cache()
+
+    md_paths = [p for p in relative_paths if p.suffix == ".md"]
+    if not md_paths and Path("llms.txt") not in relative_paths:
+        return
+
+    # llms.txt / llms-full.txt are built from the docs tree
+    invalidate_cached_llms()
+
+    if any(str(p) in NAVIGATION_FILES for p in md_paths):
+        clear_navigation_cache()
+        clear_cached_html()
+        logger.info("📝 Navigation changed: cleared HTML cache")
+        return
+
+    for rel_path in md_paths:
+        invalidate_cached_html(settings.DOCS_ROOT / rel_path)
+        logger.debug(f"Invalidated cache: {rel_path}")
+
+
+async def watch_docs(stop_event: asyncio.Event) -> None:
+    """
+    Watch DOCS_ROOT until stop_event is set, invalidating caches on change.
+    Requires the optional watchfiles package (installed with uvicorn[standard]).
+    """
+    try:
+        from watchfiles import awatch
+    except ImportError:
+        logger.info("watchfiles not installed: cached pages are only refreshed on restart")
+        return
+
+    logger.info(f"👀 Watching {settings.DOCS_ROOT} for changes")
+    set_file_path_cache_enabled(True)
+    try:
+        async for changes in awatch(settings.DOCS_ROOT, stop_event=stop_event):
+            handle_docs_changes(path for _change, path in changes)
+    except Exception as e:
+        logger.warning(f"Docs watcher stopped: {e}")
+    finally:
+        set_file_path_cache_enabled(False)
@@ -175,3 +175,129 @@ async def test_cache_handles_large_content(tmp_path, monkeypatch):
     cached = await get_cached_llms("large.txt")
     assert cached == large_content
     assert len(cached) > 100000
+
+
+@pytest.mark.asyncio
+async def test_cached_html_served_from_memory(tmp_path, monkeypatch):
+    """Saved pages are served from the in-process LRU without touching disk"""
+    from docs_server import config
+    from docs_server.caching import get_cached_html_entry, save_cached_html
+
+    docs_root = tmp_path / "docs"
+    cache_root = tmp_path / "cache"
+    docs_root.mkdir()
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", docs_root)
+    monkeypatch.setattr(config.settings, "CACHE_ROOT", cache_root)
+
+    test_file = docs_root / "test.md"
+    saved = await save_cached_html(test_file, "<h1>Test</h1>")
+
+    # Remove the disk copy: the memory entry is still served
+    (cache_root / "test.html").unlink()
+    entry = await get_cached_html_entry(test_file)
+
+    assert entry == saved
+    assert entry.content == b"<h1>Test</h1>"
+    assert entry.etag.startswith('"') and entry.etag.endswith('"')
+
+
+@pytest.mark.asyncio
+async def test_cached_html_disk_hit_is_promoted(tmp_path, monkeypatch):
+    """A page cached on disk by a previous run is loaded into memory on first read"""
+    from docs_server import caching, config
+
+    docs_root = tmp_path / "docs"
+    cache_root = tmp_path / "cache"
+    docs_root.mkdir()
+    cache_root.mkdir()
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", docs_root)
+    monkeypatch.setattr(config.settings, "CACHE_ROOT", cache_root)
+
+    (cache_root / "page.html").write_text("<p>from disk</p>")
+    entry = await caching.get_cached_html_entry(docs_root / "page.md")
+
+    assert entry.content == b"<p>from disk</p>"
+    assert str(docs_root / "page.md") in caching._hot_html
+
+
+@pytest.mark.asyncio
+async def test_cached_html_memory_lru_eviction(tmp_path, monkeypatch):
+    """The in-process LRU holds at most HTML_MEMORY_CACHE_SIZE pages"""
+    from docs_server import caching, config
+
+    docs_root = tmp_path / "docs"
+    docs_root.mkdir()
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", docs_root)
+    monkeypatch.setattr(config.settings, "CACHE_ROOT", tmp_path / "cache")
+    monkeypatch.setattr(config.settings, "HTML_MEMORY_CACHE_SIZE", 2)
+    monkeypatch.setattr(caching, "_hot_html", caching.OrderedDict())
+
+    await caching.save_cached_html(docs_root / "a.md", "a")
+    await caching.save_cached_html(docs_root / "b.md", "b")
+    await caching.get_cached_html_entry(docs_root / "a.md")  # a is now most recent
+    await caching.save_cached_html(docs_root / "c.md", "c")
+
+    assert list(caching._hot_html) == [str(docs_root / "a.md"), str(docs_root / "c.md")]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cached_html(tmp_path, monkeypatch):
+    """invalidate_cached_html drops the page from memory and disk"""
+    from docs_server import config
+    from docs_server.caching import get_cached_html_entry, invalidate_cached_html, save_cached_html
+
+    docs_root = tmp_path / "docs"
+    cache_root = tmp_path / "cache"
+    docs_root.mkdir()
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", docs_root)
+    monkeypatch.setattr(config.settings, "CACHE_ROOT", cache_root)
+
+    test_file = docs_root / "guides" / "test.md"
+    await save_cached_html(test_file, "<h1>Test</h1>")
+    invalidate_cached_html(test_file)
+
+    assert not (cache_root / "guides" / "test.html").exists()
+    assert await get_cached_html_entry(test_file) is None
+
+
+@pytest.mark.asyncio
+async def test_save_cached_html_writes_precompressed_variants(tmp_path, monkeypatch):
+    """Cached pages get .gz (and .br with brotli installed) siblings that invalidation removes"""
+    import gzip
+
+    from docs_server import caching, config
+
+    docs_root = tmp_path / "docs"
+    cache_root = tmp_path / "cache"
+    docs_root.mkdir()
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", docs_root)
+    monkeypatch.setattr(config.settings, "CACHE_ROOT", cache_root)
+
+    test_file = docs_root / "test.md"
+    entry = await caching.save_cached_html(test_file, "<h1>Test</h1>")
+
+    assert gzip.decompress((cache_root / "test.html.gz").read_bytes()) == b"<h1>Test</h1>"
+    assert gzip.decompress(entry.encoded["gzip"]) == b"<h1>Test</h1>"
+    assert (cache_root / "test.html.br").exists() == (caching.brotli is not None)
+    assert entry.etag_for("gzip") != entry.etag
+
+    caching.invalidate_cached_html(test_file)
+    assert list(cache_root.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_save_cached_llms_writes_gzip_variant(tmp_path, monkeypatch):
+    """llms cache files get a precompressed .gz sibling"""
+    import gzip
+
+    from docs_server import config
+    from docs_server.caching import get_cached_llms_variant, save_cached_llms
+
+    monkeypatch.setattr(config.settings, "CACHE_ROOT", tmp_path)
+
+    await save_cached_llms("llms.txt", "# Docs")
+
+    variant = get_cached_llms_variant("llms.txt", "gzip")
+    assert variant == tmp_path / "llms.txt.gz"
+    assert gzip.decompress(variant.read_bytes()) == b"# Docs"
+    assert get_cached_llms_variant("llms.txt", "deflate") is None
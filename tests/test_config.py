@@ -24,7 +24,7 @@ def test_settings_default_values():
     from docs_server.config import Settings
 
     # Clear any existing env vars
-    for key in ["DOCS_ROOT", "CACHE_ROOT", "BASE_URL", "DEBUG", "PORT"]:
+    for key in ["DOCS_ROOT", "CACHE_ROOT", "BASE_URL", "DEBUG", "PORT", "WORKERS"]:
         os.environ.pop(key, None)
 
     settings = Settings()
@@ -32,6 +32,7 @@ def test_settings_default_values():
     # Should use smart defaults
     assert settings.DEBUG is False
     assert settings.PORT == 8080
+    assert settings.WORKERS == 1
     assert settings.BASE_URL is None
 
 
@@ -231,3 +232,145 @@ def test_forwarded_allow_ips_reads_from_env(monkeypatch, tmp_path):
     from docs_server.config import Settings
 
     assert Settings().FORWARDED_ALLOW_IPS == "*"
+
+
+def test_md_backend_default_and_env(monkeypatch):
+    """Test MD_BACKEND default (markdown) and env override with validation."""
+    from docs_server.config import Settings
+
+    monkeypatch.delenv("MD_BACKEND", raising=False)
+    assert Settings().MD_BACKEND == "markdown"
+
+    monkeypatch.setenv("MD_BACKEND", "CMarkGFM")
+    assert Settings().MD_BACKEND == "cmarkgfm"
+
+    monkeypatch.setenv("MD_BACKEND", "mistune")
+    assert Settings().MD_BACKEND == "mistune"
+
+    # Unknown backends fall back to the default
+    monkeypatch.setenv("MD_BACKEND", "commonmark")
+    assert Settings().MD_BACKEND == "markdown"
+
+
+def test_docs_change_retires_cache_for_background_delete(tmp_path, monkeypatch):
+    """Test that a docs change renames the cache aside, keeps the MCP index and defers deletion"""
+    from docs_server.config import Settings
+
+    monkeypatch.setenv("DOCS_ROOT", str(tmp_path / "docs"))
+    monkeypatch.setenv("CACHE_ROOT", str(tmp_path / "cache"))
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "index.md").write_text("# Home")
+    Settings()
+    (tmp_path / "cache" / "index.html").write_text("cached")
+    (tmp_path / "cache" / "mcp").mkdir()
+    (tmp_path / "cache" / "mcp" / "metadata.json").write_text("{}")
+
+    (tmp_path / "docs" / "index.md").write_text("# Changed home page")
+    settings = Settings()
+
+    assert not (tmp_path / "cache" / "index.html").exists()
+    assert (tmp_path / "cache" / "mcp" / "metadata.json").exists()
+    assert len(settings.stale_cache_paths) == 1
+    stale_path = settings.stale_cache_paths[0]
+    assert (stale_path / "index.html").exists()
+
+    settings.purge_stale_caches()
+
+    assert not stale_path.exists()
+    assert settings.stale_cache_paths == []
+
+
+def test_leftover_stale_caches_are_swept(tmp_path, monkeypatch):
+    """Test that stale caches from an earlier run are picked up for deletion"""
+    from docs_server.config import Settings
+
+    monkeypatch.setenv("DOCS_ROOT", str(tmp_path / "docs"))
+    monkeypatch.setenv("CACHE_ROOT", str(tmp_path / "cache"))
+    (tmp_path / "docs").mkdir()
+    leftover = tmp_path / "cache.stale-123"
+    leftover.mkdir()
+    (leftover / "index.html").write_text("old")
+    unrelated = tmp_path / "other.stale-123"
+    unrelated.mkdir()
+    backup = tmp_path / "cache-backup.stale-1"
+    backup.mkdir()
+    (tmp_path / "cache.stale-old").mkdir()
+
+    settings = Settings()
+    settings.purge_stale_caches()
+
+    assert not leftover.exists()
+    assert unrelated.exists()
+    assert backup.exists()
+    assert (tmp_path / "cache.stale-old").exists()
+
+
+def test_find_stale_caches_matches_only_retired_names(tmp_path, monkeypatch):
+    """Test that only directories named like _retire_cache() output count as stale"""
+    from docs_server.config import Settings
+
+    monkeypatch.setenv("DOCS_ROOT", str(tmp_path / "docs"))
+    monkeypatch.setenv("CACHE_ROOT", str(tmp_path / "cache"))
+    (tmp_path / "docs").mkdir()
+    settings = Settings()
+
+    (tmp_path / "cache.stale-42").mkdir()
+    (tmp_path / "cache" / ".stale-43").mkdir()
+    # Cached copy of a docs subdirectory that happens to contain the marker
+    (tmp_path / "cache" / "notes.stale-44").mkdir()
+    (tmp_path / "cache_old.stale-2024").mkdir()
+
+    assert sorted(path.name for path in settings._find_stale_caches()) == [".stale-43", "cache.stale-42"]
+
+
+def test_worker_processes_skip_cache_validation(tmp_path, monkeypatch):
+    """Test that processes started by main() leave cache validation to the launching process"""
+    from docs_server.config import CACHE_PREPARED_ENV, Settings
+
+    monkeypatch.setenv("DOCS_ROOT", str(tmp_path / "docs"))
+    monkeypatch.setenv("CACHE_ROOT", str(tmp_path / "cache"))
+    monkeypatch.setenv(CACHE_PREPARED_ENV, "1")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / "index.html").write_text("cached")
+    (tmp_path / "cache.stale-123").mkdir()
+
+    settings = Settings()
+
+    assert (tmp_path / "cache" / "index.html").exists()
+    assert not (tmp_path / "cache" / "cache_metadata.json").exists()
+    assert settings.stale_cache_paths == []
+
+
+def test_debug_mode_ignores_cache_prepared_marker(tmp_path, monkeypatch):
+    """Test that a reloading DEBUG process still clears the cache even if the marker was inherited"""
+    from docs_server.config import CACHE_PREPARED_ENV, Settings
+
+    monkeypatch.setenv("DOCS_ROOT", str(tmp_path / "docs"))
+    monkeypatch.setenv("CACHE_ROOT", str(tmp_path / "cache"))
+    monkeypatch.setenv("DEBUG", "true")
+    monkeypatch.setenv(CACHE_PREPARED_ENV, "1")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / "index.html").write_text("stale")
+
+    settings = Settings()
+    settings.purge_stale_caches()
+
+    assert not (tmp_path / "cache" / "index.html").exists()
+
+
+def test_resolved_roots_follow_current_paths(tmp_path, monkeypatch):
+    """Test that DOCS_ROOT_ABS / CACHE_ROOT_ABS are absolute strings tracking the configured roots"""
+    from docs_server.config import Settings
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DOCS_ROOT", "docs")
+    monkeypatch.setenv("CACHE_ROOT", "cache")
+    settings = Settings()
+
+    assert settings.DOCS_ROOT_ABS == str(tmp_path.resolve() / "docs")
+    assert settings.CACHE_ROOT_ABS == str(tmp_path.resolve() / "cache")
+
+    monkeypatch.setattr(settings, "DOCS_ROOT", tmp_path / "other")
+    assert settings.DOCS_ROOT_ABS == str((tmp_path / "other").resolve())
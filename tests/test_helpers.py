@@ -106,6 +106,23 @@ def test_is_safe_path():
     # Note: Windows backslashes are treated as literal characters on Unix, so we don't test them
 
 
+def test_is_safe_path_rejects_symlink_escape(tmp_path, monkeypatch):
+    """Test that symlinks resolving outside DOCS_ROOT are rejected"""
+    from docs_server import config
+    from docs_server.helpers import get_file_path, is_safe_path
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (tmp_path / "secret.md").write_text("secret")
+    (docs / "leak.md").symlink_to(tmp_path / "secret.md")
+    (docs / "page.md").write_text("# Page")
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", docs)
+
+    assert is_safe_path("leak.md", docs) is False
+    assert get_file_path("leak.md") is None
+    assert get_file_path("page.md") == docs / "page.md"
+
+
 def test_get_file_path_success(tmp_path, monkeypatch):
     """Test get_file_path returns correct path for existing files"""
     from docs_server import config
@@ -145,6 +162,30 @@ def test_get_file_path_unsafe(tmp_path, monkeypatch):
     assert result is None
 
 
+def test_get_file_path_cached_while_watching(tmp_path, monkeypatch):
+    """With the watcher running, lookups are cached until the cache is cleared"""
+    from docs_server import config
+    from docs_server.helpers import clear_file_path_cache, get_file_path, set_file_path_cache_enabled
+
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", tmp_path)
+    set_file_path_cache_enabled(True)
+    try:
+        assert get_file_path("new.md") is None
+
+        # Negative result is cached: a new file is not seen until the watcher clears the cache
+        (tmp_path / "new.md").write_text("# New")
+        assert get_file_path("new.md") is None
+
+        clear_file_path_cache()
+        assert get_file_path("/new.md") == tmp_path / "new.md"
+    finally:
+        set_file_path_cache_enabled(False)
+
+    # Without the watcher every lookup hits the filesystem
+    (tmp_path / "new.md").unlink()
+    assert get_file_path("new.md") is None
+
+
 def test_extract_table_of_contents():
     """Test TOC extraction from HTML"""
     from docs_server.helpers import extract_table_of_contents
@@ -370,6 +411,26 @@ def test_parse_sidebar_navigation_with_content(tmp_path, monkeypatch):
     assert result[2]["title"] == "API Reference"
 
 
+def test_parse_sidebar_navigation_cached_until_file_changes(tmp_path, monkeypatch):
+    """Test that sidebar.md is parsed once and re-parsed when it changes"""
+    import os
+
+    from docs_server import config
+    from docs_server.helpers import parse_sidebar_navigation
+
+    sidebar_file = tmp_path / "sidebar.md"
+    sidebar_file.write_text("* [Overview](overview.md)\n")
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", tmp_path)
+
+    first = parse_sidebar_navigation()
+    assert parse_sidebar_navigation() is first
+
+    sidebar_file.write_text("* [Overview](overview.md)\n* [API](api.md)\n")
+    os.utime(sidebar_file, ns=(0, 0))
+
+    assert [item["title"] for item in parse_sidebar_navigation()] == ["Overview", "API"]
+
+
 def test_parse_sidebar_navigation_root_relative_links(tmp_path, monkeypatch):
     """Test that sidebar links in subdirs and external URLs are handled correctly"""
     from docs_server import config
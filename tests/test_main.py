@@ -3,6 +3,7 @@ Unit tests for main module.
 Tests CLI argument parsing, main() entry point, and key routes.
 """
 
+import json
 import sys
 from unittest.mock import patch
 
@@ -48,6 +49,7 @@ def test_main_passes_proxy_headers_to_uvicorn():
     ):
         mock_settings.PORT = 8080
         mock_settings.DEBUG = False
+        mock_settings.WORKERS = 1
         mock_settings.FORWARDED_ALLOW_IPS = "127.0.0.1"
         with patch.object(sys, "argv", ["docs_server"]):
             from docs_server.main import main
@@ -67,6 +69,7 @@ def test_main_forwards_custom_allow_ips():
     ):
         mock_settings.PORT = 8080
         mock_settings.DEBUG = False
+        mock_settings.WORKERS = 1
         mock_settings.FORWARDED_ALLOW_IPS = "*"
         with patch.object(sys, "argv", ["docs_server"]):
             from docs_server.main import main
@@ -76,6 +79,41 @@ def test_main_forwards_custom_allow_ips():
         assert mock_uvicorn.call_args.kwargs["forwarded_allow_ips"] == "*"
 
 
+def test_main_runs_workers_and_marks_cache_prepared():
+    """main() marks the cache prepared only for multi-worker runs, never for a reloading DEBUG worker."""
+    import os
+
+    from docs_server.config import CACHE_PREPARED_ENV
+
+    seen_env = []
+    with (
+        patch("docs_server.main.settings") as mock_settings,
+        patch(
+            "uvicorn.run", side_effect=lambda *a, **kw: seen_env.append(os.getenv(CACHE_PREPARED_ENV))
+        ) as mock_uvicorn,
+    ):
+        mock_settings.DEBUG = False
+        mock_settings.WORKERS = 4
+        with patch.object(sys, "argv", ["docs_server"]):
+            from docs_server.main import main
+
+            main()
+            assert mock_uvicorn.call_args.kwargs["workers"] == 4
+
+            mock_settings.WORKERS = 1
+            main()
+            assert mock_uvicorn.call_args.kwargs["workers"] == 1
+
+            mock_settings.DEBUG = True
+            mock_settings.WORKERS = 4
+            main()
+            assert mock_uvicorn.call_args.kwargs["workers"] is None
+            assert mock_uvicorn.call_args.kwargs["reload"] is True
+
+    assert seen_env == ["1", None, None]
+    assert CACHE_PREPARED_ENV not in os.environ
+
+
 def test_main_parses_clear_cache_with_other_args():
     """Test that --clear-cache is parsed correctly alongside other args (parse_known_args)"""
     with (
@@ -150,3 +188,311 @@ async def test_servemd_route_shows_mcp_disabled(temp_docs_for_servemd):
     # The install buttons (deep links) must not be present when MCP is disabled
     assert "cursor://anysphere.cursor-deeplink" not in response.text
     assert "vscode://mcp/install" not in response.text
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET (ETag / Last-Modified)
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def docs_settings(temp_docs_for_servemd, monkeypatch):
+    """Point the real settings at a temporary docs root and cache root."""
+    from docs_server import config
+
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", temp_docs_for_servemd)
+    monkeypatch.setattr(config.settings, "CACHE_ROOT", temp_docs_for_servemd.parent / "cache")
+    return config.settings
+
+
+@pytest.mark.asyncio
+async def test_raw_markdown_has_validators_and_304(docs_settings):
+    """GET /index.md streams the file with ETag/Last-Modified and honours If-None-Match."""
+    from docs_server.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/index.md")
+        assert response.status_code == 200
+        assert response.text == "# Home\n\nWelcome."
+        assert response.headers["content-type"] == "text/markdown; charset=utf-8"
+        etag = response.headers["etag"]
+        # Weak: the same validator covers the identity and on-the-fly gzip bodies
+        assert etag.startswith('W/"')
+        assert response.headers["last-modified"]
+
+        not_modified = await client.get("/index.md", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        since = await client.get("/index.md", headers={"If-Modified-Since": response.headers["last-modified"]})
+        assert since.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_cached_html_served_from_disk_with_304(docs_settings):
+    """A cached page is served from the cache file with an ETag, then 304 on revalidation."""
+    from docs_server.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        rendered = await client.get("/index.html")
+        assert rendered.status_code == 200
+
+        cached = await client.get("/index.html")
+        assert cached.status_code == 200
+        assert cached.text == rendered.text
+        assert "text/html" in cached.headers["content-type"]
+
+        not_modified = await client.get("/index.html", headers={"If-None-Match": cached.headers["etag"]})
+        assert not_modified.status_code == 304
+
+        stale = await client.get("/index.html", headers={"If-None-Match": '"other"'})
+        assert stale.status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("url", "looked_up"),
+    [
+        ("/gone.md", "gone.md"),
+        ("/gone.png", "gone.png"),
+        ("/gone.html?highlight=x", "gone.md"),
+        ("/gone.html", "gone.html"),
+        ("/raw/gone.txt", "gone.txt"),
+    ],
+)
+async def test_file_deleted_after_lookup_returns_404(docs_settings, url, looked_up):
+    """A file removed between get_file_path() and reading it is a 404, not a 500."""
+    from docs_server.main import app
+
+    def stale_lookup(path):
+        # Cached lookup result for a file that no longer exists
+        return docs_settings.DOCS_ROOT / looked_up if path == looked_up else None
+
+    with patch("docs_server.main.get_file_path", side_effect=stale_lookup):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(url)
+
+    assert response.status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# llms-full.txt link parsing
+# ---------------------------------------------------------------------------
+
+
+def test_md_link_regex_matches_absolute_md_links():
+    """_MD_LINK_RE extracts absolute .md links (with optional anchor) and skips others."""
+    from docs_server.main import _MD_LINK_RE
+
+    content = (
+        "* [Home](https://docs.example.com/index.md)\n"
+        "* [API](https://docs.example.com/api/endpoints.md#health)\n"
+        "* [Site](https://example.com/page.html)\n"
+        "* [Broken](https://docs.example.com/has space.md)\n"
+    )
+
+    assert _MD_LINK_RE.findall(content) == [
+        ("Home", "https://docs.example.com/index.md"),
+        ("API", "https://docs.example.com/api/endpoints.md#health"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_llms_full_txt_appends_pages_in_link_order(docs_settings, monkeypatch):
+    """GET /llms-full.txt appends each linked page once, in order, skipping missing files."""
+    from docs_server.main import app
+
+    docs = docs_settings.DOCS_ROOT
+    (docs / "guide.md").write_text("# Guide")
+    (docs / "llms.txt").write_text(
+        "# Docs\n\n- [Guide](guide.md)\n- [Home](index.md#intro)\n- [Missing](missing.md)\n- [Again](guide.md)\n"
+    )
+    monkeypatch.setattr(docs_settings, "BASE_URL", "https://docs.example.com")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/llms-full.txt")
+
+    assert response.status_code == 200
+    text = response.text
+    assert text.count("<url>") == 2
+    assert text.index("<url>https://docs.example.com/guide.md</url>") < text.index(
+        "<url>https://docs.example.com/index.md#intro</url>"
+    )
+    assert "<content>\n# Guide\n</content>" in text
+    assert "missing.md</url>" not in text
+
+
+@pytest.mark.asyncio
+async def test_llms_full_txt_skips_links_outside_docs_root(docs_settings, monkeypatch):
+    """Links in llms.txt cannot pull files from outside DOCS_ROOT into llms-full.txt."""
+    from docs_server.main import app
+
+    docs = docs_settings.DOCS_ROOT
+    (docs.parent / "secret.md").write_text("TOP SECRET")
+    (docs / "llms.txt").write_text("# Docs\n\n- [Secret](https://docs.example.com/../secret.md)\n")
+    monkeypatch.setattr(docs_settings, "BASE_URL", "https://docs.example.com")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/llms-full.txt")
+
+    assert response.status_code == 200
+    assert "TOP SECRET" not in response.text
+
+
+@pytest.mark.asyncio
+async def test_llms_full_txt_streamed_then_cached(docs_settings, monkeypatch):
+    """GET /llms-full.txt streams the document and caches it once fully sent."""
+    from docs_server.main import app
+
+    monkeypatch.setattr(docs_settings, "BASE_URL", "https://docs.example.com")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        streamed = await client.get("/llms-full.txt", headers={"Accept-Encoding": "identity"})
+        assert "content-length" not in streamed.headers
+        cached = await client.get("/llms-full.txt", headers={"Accept-Encoding": "identity"})
+
+    assert (docs_settings.CACHE_ROOT / "llms-full.txt").read_text(encoding="utf-8") == streamed.text
+    assert cached.headers["content-length"] == str(len(streamed.content))
+    assert cached.text == streamed.text
+
+
+# ---------------------------------------------------------------------------
+# Media types
+# ---------------------------------------------------------------------------
+
+
+def test_media_type_for_suffix():
+    """Known suffixes use the static table, others fall back to mimetypes or octet-stream."""
+    from docs_server.main import media_type_for_suffix
+
+    assert media_type_for_suffix(".html") == "text/html; charset=utf-8"
+    assert media_type_for_suffix(".png") == "image/png"
+    assert media_type_for_suffix(".pdf") == "application/pdf"
+    assert media_type_for_suffix(".txt") == "text/plain"
+    assert media_type_for_suffix(".unknownext") == "application/octet-stream"
+    assert media_type_for_suffix("") == "application/octet-stream"
+
+
+# ---------------------------------------------------------------------------
+# Precompressed responses
+# ---------------------------------------------------------------------------
+
+
+def test_accepted_encodings_order_and_q_values():
+    """Only br/gzip are negotiated, brotli first, and q=0 excludes an encoding."""
+    from starlette.requests import Request
+
+    from docs_server.main import _accepted_encodings
+
+    def request_with(accept_encoding):
+        return Request({"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+    assert _accepted_encodings(request_with("gzip, deflate, br")) == ["br", "gzip"]
+    assert _accepted_encodings(request_with("gzip;q=0.5, br;q=0")) == ["gzip"]
+    assert _accepted_encodings(request_with("identity")) == []
+    # The wildcard does not bring back codings refused explicitly
+    assert _accepted_encodings(request_with("gzip;q=0, *")) == ["br"]
+    assert _accepted_encodings(request_with("br;q=0,*;q=1")) == ["gzip"]
+    assert _accepted_encodings(request_with("*")) == ["br", "gzip"]
+    assert _accepted_encodings(request_with("gzip, *;q=0")) == ["gzip"]
+
+
+@pytest.mark.asyncio
+async def test_cached_html_served_precompressed(docs_settings):
+    """Cached pages are sent gzip-encoded when accepted, identity otherwise."""
+    from docs_server.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/index.html")
+        plain = await client.get("/index.html", headers={"Accept-Encoding": "identity"})
+        encoded = await client.get("/index.html", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.headers["vary"] == "Accept-Encoding"
+    # httpx transparently decodes the body
+    assert encoded.text == plain.text
+    assert encoded.headers["etag"] != plain.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_cached_llms_txt_served_precompressed(docs_settings, monkeypatch):
+    """Cached llms.txt uses the precompressed .gz sibling when the client accepts gzip."""
+    from docs_server.main import app
+
+    monkeypatch.setattr(docs_settings, "BASE_URL", "https://docs.example.com")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        generated = await client.get("/llms.txt", headers={"Accept-Encoding": "identity"})
+        cached = await client.get("/llms.txt", headers={"Accept-Encoding": "gzip"})
+
+    assert cached.headers["content-encoding"] == "gzip"
+    assert cached.text == generated.text
+
+
+@pytest.mark.asyncio
+async def test_cached_llms_txt_falls_back_when_variant_vanishes(docs_settings, monkeypatch):
+    """A precompressed sibling removed after the lookup falls back to the identity body."""
+    from docs_server.main import app
+
+    monkeypatch.setattr(docs_settings, "BASE_URL", "https://docs.example.com")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        generated = await client.get("/llms.txt", headers={"Accept-Encoding": "identity"})
+        with patch("docs_server.main.get_cached_llms_variant", return_value=docs_settings.CACHE_ROOT / "llms.txt.gone"):
+            cached = await client.get("/llms.txt", headers={"Accept-Encoding": "br, gzip"})
+
+    assert cached.status_code == 200
+    assert "content-encoding" not in cached.headers
+    assert cached.text == generated.text
+
+
+@pytest.mark.asyncio
+async def test_dynamic_html_is_gzipped_on_the_fly(docs_settings):
+    """Uncached pages (search highlighting) are compressed by the GZip middleware."""
+    from docs_server.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        plain = await client.get("/index.html?highlight=servemd", headers={"Accept-Encoding": "identity"})
+        encoded = await client.get("/index.html?highlight=servemd", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.text == plain.text
+
+
+def test_fast_json_response_matches_json_response():
+    """FastJSONResponse produces the same compact UTF-8 JSON as JSONResponse."""
+    from fastapi.responses import JSONResponse
+
+    from docs_server.main import FastJSONResponse
+
+    content = {"query": "café", "count": 2, "results": [{"score": 1.5, "path": "a.md"}], "html": None}
+
+    assert json.loads(FastJSONResponse(content).body) == content
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_request_base_url_cached_per_host_and_proto(monkeypatch):
+    """Derived base URLs honour X-Forwarded-Proto and are cached per host; BASE_URL wins."""
+    from starlette.requests import Request
+
+    from docs_server import main
+
+    def make_request(host: str, proto: str = "") -> Request:
+        headers = [(b"host", host.encode())]
+        if proto:
+            headers.append((b"x-forwarded-proto", proto.encode()))
+        return Request({"type": "http", "scheme": "http", "path": "/", "headers": headers, "server": ("10.0.0.1", 80)})
+
+    monkeypatch.setattr(main.settings, "BASE_URL", None)
+    monkeypatch.setattr(main, "_base_url_cache", {})
+
+    assert main._request_base_url(make_request("docs.example.com", "https")) == "https://docs.example.com"
+    assert main._request_base_url(make_request("docs.example.com")) == "http://docs.example.com"
+    assert main._request_base_url(make_request("other.example.com")) == "http://other.example.com"
+    assert len(main._base_url_cache) == 3
+
+    monkeypatch.setattr(main.settings, "BASE_URL", "https://configured.example.com")
+    assert main._request_base_url(make_request("docs.example.com")) == "https://configured.example.com"
@@ -153,3 +153,103 @@ async def test_render_markdown_with_special_characters(tmp_path):
 
     # HTML entities should be escaped
     assert "&amp;" in result or "&lt;" in result or "Special" in result
+
+
+def test_add_heading_ids_matches_toc_output():
+    """Headings from the fast backends get toc-style ids and permalinks"""
+    from docs_server.markdown_service import add_heading_ids
+
+    result = add_heading_ids("<h1>Hello <em>World</em></h1>\n<h2>Sec &amp; 1</h2>\n<h2>Sec &amp; 1</h2>")
+
+    assert '<h1 id="hello-world">Hello <em>World</em><a class="headerlink" href="#hello-world"' in result
+    assert '<h2 id="sec-1">' in result
+    assert '<h2 id="sec-1_1">' in result
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["cmarkgfm", "mistune"])
+async def test_render_markdown_fast_backends(tmp_path, monkeypatch, backend):
+    """Test rendering with the optional cmarkgfm/mistune backends"""
+    pytest.importorskip(backend)
+    from docs_server import config
+    from docs_server.helpers import extract_table_of_contents
+    from docs_server.markdown_service import render_markdown_to_html
+
+    monkeypatch.setattr(config.settings, "MD_BACKEND", backend)
+
+    content = "# Main Title\n\n## Section 1\n\n[Link](page.md)\n\n| A | B |\n|---|---|\n| 1 | 2 |\n"
+    result = await render_markdown_to_html(content, tmp_path / "test.md")
+
+    assert "<table>" in result
+    assert "page.html" in result
+    toc_items = extract_table_of_contents(result)
+    assert [item["id"] for item in toc_items] == ["main-title", "section-1"]
+
+
+@pytest.mark.asyncio
+async def test_render_markdown_missing_backend_falls_back(tmp_path, monkeypatch):
+    """An uninstalled MD_BACKEND falls back to Python-Markdown"""
+    from docs_server import config, markdown_service
+
+    monkeypatch.setattr(config.settings, "MD_BACKEND", "cmarkgfm")
+    monkeypatch.setattr(markdown_service, "cmarkgfm", None)
+
+    assert markdown_service.get_markdown_backend() == "markdown"
+    result = await markdown_service.render_markdown_to_html("# Title\n\n```python\nx = 1\n```", tmp_path / "t.md")
+    assert 'class="highlight"' in result
+
+
+@pytest.mark.asyncio
+async def test_render_markdown_reuses_instance_without_leaking_state(tmp_path):
+    """Pooled Markdown instances are reset between renders"""
+    from docs_server import markdown_service
+    from docs_server.markdown_service import render_markdown_to_html
+
+    first = await render_markdown_to_html(
+        "# Intro\n\nThe HTML spec[^1].\n\n*[HTML]: Hyper Text\n\n[^1]: note", tmp_path / "a.md"
+    )
+    pool_size = markdown_service._md_pool.qsize()
+    second = await render_markdown_to_html("# Intro\n\nPlain HTML.", tmp_path / "b.md")
+
+    assert "<abbr" in first and "footnote" in first
+    assert "<abbr" not in second
+    assert "footnote" not in second
+    # Heading ids restart for every document (no "intro_1")
+    assert 'id="intro"' in second
+    assert markdown_service._md_pool.qsize() == pool_size
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["markdown", "cmarkgfm", "mistune"])
+async def test_render_markdown_returns_toc_items(tmp_path, monkeypatch, backend):
+    """render_markdown collects every heading (h1-h6) for the TOC while rendering"""
+    if backend != "markdown":
+        pytest.importorskip(backend)
+    from docs_server import config
+    from docs_server.helpers import extract_table_of_contents
+    from docs_server.markdown_service import render_markdown
+
+    monkeypatch.setattr(config.settings, "MD_BACKEND", backend)
+
+    content = "# Main Title\n\n## A & B\n\n### Deeper\n\n#### Too deep\n\n## A & B\n"
+    rendered = await render_markdown(content, tmp_path / "test.md")
+
+    assert rendered.toc_items == [
+        {"id": "main-title", "title": "Main Title", "level": 1},
+        {"id": "a-b", "title": "A &amp; B", "level": 2},
+        {"id": "deeper", "title": "Deeper", "level": 3},
+        {"id": "too-deep", "title": "Too deep", "level": 4},
+        {"id": "a-b_1", "title": "A &amp; B", "level": 2},
+    ]
+    # Same entries as scraping the rendered HTML
+    assert rendered.toc_items == extract_table_of_contents(rendered.html)
+
+
+@pytest.mark.asyncio
+async def test_render_mermaid_fence(tmp_path):
+    """```mermaid fences render as an escaped div for mermaid.js"""
+    from docs_server.markdown_service import render_markdown_to_html
+
+    result = await render_markdown_to_html("```mermaid\ngraph TD; A-->B & C\n```\n", tmp_path / "t.md")
+
+    assert '<div class="mermaid">graph TD; A--&gt;B &amp; C</div>' in result
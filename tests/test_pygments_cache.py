@@ -0,0 +1,70 @@
+"""
+Unit tests for pygments_cache module.
+Tests memoization of Pygments lexers and formatters.
+"""
+
+import pytest
+
+
+def test_cached_lexer_is_reused():
+    """Same alias and options return the same lexer instance"""
+    from docs_server.pygments_cache import cached_get_lexer_by_name, clear_highlight_caches
+
+    clear_highlight_caches()
+    first = cached_get_lexer_by_name("python", stripnl=False)
+    second = cached_get_lexer_by_name("python", stripnl=False)
+    other = cached_get_lexer_by_name("python", stripnl=True)
+
+    assert first is second
+    assert first is not other
+
+
+def test_cached_lexer_unknown_alias_raises():
+    """Unknown aliases still raise ClassNotFound (a ValueError) like Pygments"""
+    from docs_server.pygments_cache import cached_get_lexer_by_name
+
+    with pytest.raises(ValueError):
+        cached_get_lexer_by_name("not-a-real-language")
+
+
+def test_cached_formatter_class_handles_list_options():
+    """Formatter options with lists (e.g. hl_lines) are cached by value"""
+    from pygments.formatters import HtmlFormatter
+
+    from docs_server.pygments_cache import cached_formatter_class, clear_highlight_caches
+
+    clear_highlight_caches()
+    build = cached_formatter_class(HtmlFormatter)
+
+    first = build(cssclass="highlight", hl_lines=[1, 2])
+    second = build(cssclass="highlight", hl_lines=[1, 2])
+    other = build(cssclass="highlight", hl_lines=[3])
+
+    assert first is second
+    assert first is not other
+    assert first.hl_lines == {1, 2}
+
+
+def test_clear_highlight_caches():
+    """clear_highlight_caches() drops cached lexers"""
+    from docs_server.pygments_cache import cached_get_lexer_by_name, clear_highlight_caches
+
+    first = cached_get_lexer_by_name("python")
+    clear_highlight_caches()
+
+    assert cached_get_lexer_by_name("python") is not first
+
+
+def test_install_highlight_caches_patches_extensions():
+    """Installing is idempotent and patches codehilite and pymdownx.highlight"""
+    from markdown.extensions import codehilite
+    from pymdownx import highlight
+
+    from docs_server.pygments_cache import cached_get_lexer_by_name, install_highlight_caches
+
+    install_highlight_caches()
+    install_highlight_caches()
+
+    assert codehilite.get_lexer_by_name is cached_get_lexer_by_name
+    assert highlight.get_lexer_by_name is cached_get_lexer_by_name
+    assert isinstance(highlight.BlockHtmlFormatter.__wrapped__, type)
@@ -0,0 +1,107 @@
+"""
+Unit tests for watcher module.
+Tests cache invalidation when files under DOCS_ROOT change.
+"""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def cached_docs(tmp_path, monkeypatch):
+    """Docs root with two pages and a populated HTML/llms cache."""
+    from docs_server import config
+
+    docs_root = tmp_path / "docs"
+    cache_root = tmp_path / "cache"
+    docs_root.mkdir()
+    cache_root.mkdir()
+    monkeypatch.setattr(config.settings, "DOCS_ROOT", docs_root)
+    monkeypatch.setattr(config.settings, "CACHE_ROOT", cache_root)
+
+    for name in ("index", "guide"):
+        (docs_root / f"{name}.md").write_text(f"# {name}")
+        (cache_root / f"{name}.html").write_text(f"<h1>{name}</h1>")
+    (cache_root / "llms.txt").write_text("cached")
+    (cache_root / "llms-full.txt").write_text("cached")
+    return docs_root, cache_root
+
+
+def test_page_change_invalidates_only_that_page(cached_docs):
+    """Editing a page drops its cached HTML and the llms caches"""
+    from docs_server.watcher import handle_docs_changes
+
+    docs_root, cache_root = cached_docs
+    handle_docs_changes([str(docs_root / "guide.md")])
+
+    assert not (cache_root / "guide.html").exists()
+    assert (cache_root / "index.html").exists()
+    assert not (cache_root / "llms.txt").exists()
+    assert not (cache_root / "llms-full.txt").exists()
+
+
+def test_changes_clear_file_path_cache(cached_docs):
+    """Any change under DOCS_ROOT (e.g. a new asset) clears cached file lookups"""
+    from docs_server.helpers import get_file_path, set_file_path_cache_enabled
+    from docs_server.watcher import handle_docs_changes
+
+    docs_root, _cache_root = cached_docs
+    set_file_path_cache_enabled(True)
+    try:
+        assert get_file_path("logo.png") is None
+        (docs_root / "logo.png").write_bytes(b"png")
+        handle_docs_changes([str(docs_root / "logo.png")])
+
+        assert get_file_path("logo.png") == docs_root / "logo.png"
+    finally:
+        set_file_path_cache_enabled(False)
+
+
+def test_navigation_change_clears_all_pages(cached_docs):
+    """Editing sidebar.md drops every cached page"""
+    from docs_server.watcher import handle_docs_changes
+
+    docs_root, cache_root = cached_docs
+    handle_docs_changes([str(docs_root / "sidebar.md")])
+
+    assert list(cache_root.glob("*.html")) == []
+
+
+def test_navigation_change_clears_parsed_navigation(cached_docs):
+    """Editing topbar.md forgets the parsed navigation"""
+    from docs_server import helpers
+    from docs_server.watcher import handle_docs_changes
+
+    docs_root, _cache_root = cached_docs
+    (docs_root / "topbar.md").write_text("## left\n* [Home](index.md)\n")
+    helpers.parse_topbar_links()
+    assert helpers._nav_cache
+
+    handle_docs_changes([str(docs_root / "topbar.md")])
+
+    assert not helpers._nav_cache
+
+
+def test_unrelated_changes_are_ignored(cached_docs, tmp_path):
+    """Non-markdown files and paths outside DOCS_ROOT keep the cache"""
+    from docs_server.watcher import handle_docs_changes
+
+    docs_root, cache_root = cached_docs
+    handle_docs_changes([str(docs_root / "assets" / "logo.png"), str(tmp_path / "elsewhere.md")])
+
+    assert (cache_root / "index.html").exists()
+    assert (cache_root / "llms.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_watch_docs_stops_on_event(cached_docs):
+    """watch_docs returns once the stop event is set"""
+    from docs_server.watcher import watch_docs
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(watch_docs(stop))
+    await asyncio.sleep(0.1)
+    stop.set()
+
+    await asyncio.wait_for(task, timeout=5)